@@ -0,0 +1,86 @@
+"""
+Measures the time taken to build the derivative graph of a deep polynomial with `backward`,
+which is dominated by the checks that simplify constant operands. The fast checks are compared
+against calling `np.allclose` for every check, as the simplifiers did before `is_close` and the
+zero/one classes cached on constants
+
+Run from the repository root with `python -m benchmarks.backward_constants`
+"""
+
+from contextlib import contextmanager
+import time
+
+import numpy as np
+
+from main import expression as expression_module
+from main.expression import Constant, Variable, clear_derivative_cache, fmt_as_exp
+from main.operations import addition, exponent, logarithm, multiplication, power
+from main.operations.addition import add
+from main.operations.multiplication import multiply
+
+# The degree of the benchmarked polynomial
+DEGREE = 2000
+
+# The number of times the derivative is rebuilt
+REPEATS = 5
+
+
+def horner(x: Variable, degree: int):
+    """Builds the polynomial 1 + 2x + 3x^2 + ... in Horner form, one level per coefficient"""
+    expression = x
+    for i in range(degree, 0, -1):
+        expression = add(multiply(expression, x), fmt_as_exp(float(i)))
+    return expression
+
+
+@contextmanager
+def allclose_checks():
+    """Makes every constant check call `np.allclose`, without any fast path or caching"""
+
+    def allclose(value, target):
+        return bool(np.allclose(value, target))
+
+    modules = [expression_module, addition, exponent, logarithm, multiplication, power]
+    originals = [module.is_close for module in modules]
+    is_zero, is_one = Constant.is_zero, Constant.is_one
+    for module in modules:
+        module.is_close = allclose
+    Constant.is_zero = property(lambda self: allclose(self.value, 0))
+    Constant.is_one = property(lambda self: allclose(self.value, 1))
+    try:
+        yield
+    finally:
+        for module, original in zip(modules, originals):
+            module.is_close = original
+        Constant.is_zero, Constant.is_one = is_zero, is_one
+
+
+def time_backward(x: Variable, polynomial) -> float:
+    """Returns the best time taken to build the first and second derivatives of `polynomial`"""
+    timings = []
+    for _ in range(REPEATS):
+        clear_derivative_cache()
+        start = time.perf_counter()
+        derivative = polynomial.backward(x)
+        derivative.backward(x)
+        timings.append(time.perf_counter() - start)
+    clear_derivative_cache()
+    return min(timings)
+
+
+def main():
+    x = Variable("x")
+    polynomial = horner(x, DEGREE)
+
+    with allclose_checks():
+        before = time_backward(x, polynomial)
+    after = time_backward(x, polynomial)
+
+    print(f"degree:   {DEGREE}")
+    print(f"backward: {before * 1000:.1f} ms (np.allclose for every check)")
+    print(f"backward: {after * 1000:.1f} ms (is_close and cached constant classes)")
+    print(f"          first and second derivatives, best of {REPEATS}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Measures the memory used per node by large expression graphs, along with the time taken to
+evaluate them. Bare nodes are compared against nodes that keep the same attributes in a
+`__dict__` instead of `__slots__`
+
+Run from the repository root with `python -m benchmarks.node_memory`
+"""
+
+import gc
+import time
+import tracemalloc
+
+from main.expression import Variable, postorder
+from main.operations.addition import Sum, add
+from main.operations.multiplication import multiply
+from main.operations.power import power
+from main.operations.division import divide
+from main.operations.subtraction import subtract
+
+# The number of terms of the benchmarked expression
+TERMS = 100_000
+
+# The number of evaluations that the evaluation time is averaged over
+EVALUATIONS = 5
+
+
+class DictSum:
+    """A sum holding the same attributes as `Sum`, but in a `__dict__` rather than in slots"""
+
+    def __init__(self, a, b):
+        self.a = a
+        self.b = b
+        self._hash = hash((Sum, *sorted((hash(a), hash(b)))))
+
+
+def build(x: Variable, y: Variable, terms: int):
+    """Builds a long chain mixing every binary node type, with a distinct constant per term"""
+    expression = x
+    for i in range(terms):
+        term = divide(multiply(x, y), power(y, i % 7 + 2))
+        expression = add(subtract(expression, term), multiply(x, i + 1))
+    return expression
+
+
+def traced(function):
+    """Returns the result of a function along with the number of bytes it left allocated"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = function()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def main():
+    x, y = Variable("x"), Variable("y")
+
+    # The size of bare nodes, without the constants and interning entries of a built graph
+    sums, size = traced(lambda: [DictSum(x, y) for _ in range(TERMS)])
+    print(f"bytes per bare node:  {size / len(sums):.1f} (with a __dict__)")
+    del sums
+    sums, size = traced(lambda: [Sum(x, y) for _ in range(TERMS)])
+    print(f"bytes per bare node:  {size / len(sums):.1f} (with __slots__)")
+    del sums
+
+    expression, size = traced(lambda: build(x, y, TERMS))
+    nodes = len(postorder(expression))
+    print(f"graph nodes:          {nodes}")
+    print(f"bytes per graph node: {size / nodes:.1f}")
+
+    start = time.perf_counter()
+    for _ in range(EVALUATIONS):
+        expression.compute({x: 0.5, y: 1.5})
+    elapsed = (time.perf_counter() - start) / EVALUATIONS
+    print(f"compute:              {elapsed * 1000:.1f} ms per evaluation")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Generates specialized Python source code for an expression, so it can be evaluated as a plain
+function without any graph traversal, method dispatch or dictionary lookups
+"""
+
+from __future__ import annotations
+from itertools import count
+from keyword import iskeyword
+from typing import Callable, Dict, Sequence
+import linecache
+import re
+
+import numpy as np
+
+from main.expression import ExpressionBase, Variable, Constant, postorder
+
+# Names that generated code uses for its own purposes, which arguments must not shadow
+_RESERVED_NAME = re.compile(r"^(np|[vc]\d+)$")
+
+# Gives every generated function a unique file name, so its source can be registered with
+# `linecache` (and shows up in tracebacks and `inspect.getsource`)
+_FUNCTION_IDS = count()
+
+
+def to_python_source(
+    expression: ExpressionBase, args: Sequence[Variable], name: str = "f"
+) -> tuple[str, Dict[str, float | np.ndarray]]:
+    """
+    Generates the source code of a Python function that computes an expression. The function
+    takes the value of each variable as a positional argument and evaluates every unique node
+    of the expression exactly once, storing it in its own local variable.
+
+    Parameters
+    ----------
+    expression: ExpressionBase
+        The expression to generate code for
+    args: Sequence[Variable]
+        The variables of the expression, in the order that the generated function should take
+        their values as arguments
+    name: str
+        The name of the generated function
+
+    Returns
+    -------
+    tuple[str, Dict[str, float | np.ndarray]]
+        The source code of the function, along with the constants that it refers to by name
+    """
+    names: Dict[int, str] = {}
+    params = []
+    for i, var in enumerate(args):
+        param = var.name
+        if (
+            not param.isidentifier()
+            or iskeyword(param)
+            or _RESERVED_NAME.match(param)
+            or param in params
+        ):
+            # Fallback names may themselves be taken by the names of other variables
+            param = f"arg{i}"
+            for suffix in count(1):
+                if param not in params:
+                    break
+                param = f"arg{i}_{suffix}"
+        params.append(param)
+        names[id(var)] = param
+
+    constants: Dict[str, float | np.ndarray] = {}
+
+    def constant_name(value):
+        constant = f"c{len(constants)}"
+        constants[constant] = value
+        return constant
+
+    lines = [f"def {name}({', '.join(params)}):"]
+    for node in postorder(expression):
+        if isinstance(node, Variable):
+            if id(node) not in names:
+                raise ValueError(f"The variable {node} is not listed in `args`")
+        elif isinstance(node, Constant):
+            names[id(node)] = constant_name(node.value)
+        else:
+            operands = [
+                names[id(op)] if isinstance(op, ExpressionBase) else constant_name(op)
+                for op in node.operands()
+            ]
+            names[id(node)] = f"v{len(lines) - 1}"
+            lines.append(f"    {names[id(node)]} = {node.source(*operands)}")
+
+    lines.append(f"    return {names[id(expression)]}")
+    return "\n".join(lines) + "\n", constants
+
+
+def to_python_function(
+    expression: ExpressionBase, args: Sequence[Variable], name: str = "f"
+) -> Callable[..., float | np.ndarray]:
+    """
+    Compiles an expression into a plain Python function that takes the value of each variable
+    as a positional argument. The generated function is straight-line numpy code, so calling
+    it avoids all of the per-node overhead of `ExpressionBase.compute`.
+
+    The generated source is available as the `source` attribute of the returned function.
+
+    Parameters
+    ----------
+    expression: ExpressionBase
+        The expression to compile
+    args: Sequence[Variable]
+        The variables of the expression, in the order that the returned function should take
+        their values as arguments
+    name: str
+        The name of the generated function
+
+    Returns
+    -------
+    Callable[..., float | np.ndarray]
+        A function that returns `expression` evaluated at the given values
+    """
+    source, constants = to_python_source(expression, args, name)
+    filename = f"<deltapy-codegen-{next(_FUNCTION_IDS)}>"
+    linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+
+    namespace = {"np": np, **constants}
+    exec(compile(source, filename, "exec"), namespace)
+
+    function = namespace[name]
+    function.source = source
+    return function
@@ -0,0 +1,468 @@
+"""
+Compiles expression graphs into a flat `Tape` of instructions that can be evaluated repeatedly
+without walking the graph
+"""
+
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Dict, List, Sequence, Tuple
+import numpy as np
+
+from main.expression import ExpressionBase, Variable, Constant, postorder
+from main.operations.addition import Sum, NarySum
+from main.operations.subtraction import Difference
+from main.operations.multiplication import Product, NaryProduct
+from main.operations.division import Quotient
+from main.operations.power import Power
+from main.operations.exponent import Exponent
+from main.operations.logarithm import Logarithm
+
+# Every node type, indexed by its opcode. New node types should only ever be appended so that
+# existing opcodes remain stable
+NODE_TYPES: List[type] = [
+    Variable,
+    Constant,
+    Sum,
+    Difference,
+    Product,
+    Quotient,
+    Power,
+    Exponent,
+    Logarithm,
+    NarySum,
+    NaryProduct,
+]
+
+OPCODES: Dict[type, int] = {cls: opcode for opcode, cls in enumerate(NODE_TYPES)}
+
+# The number of `BufferPlan`s (and their buffers) that a tape keeps for values of different
+# shapes. Least recently used plans are evicted first. Two plans cover a stream of equal chunks
+# followed by a shorter last chunk
+PLAN_CACHE_SIZE = 2
+
+
+class Tape:
+    """
+    A compiled form of an expression. Every unique node of the expression is assigned a slot,
+    and each operation is stored as an instruction that reads the slots of its operands and
+    writes the slot of its result. Instructions are topologically sorted, so evaluating the
+    expression is a single loop over the tape, and shared nodes are only evaluated once.
+
+    Attributes
+    ----------
+    instructions: List[Tuple[int, Tuple[int, ...], int]]
+        The `(opcode, input slots, output slot)` record of every operation, in evaluation order
+    variables: List[Tuple[Variable, int]]
+        Every variable of the expression along with the slot it is loaded into
+    constants: List[float | np.ndarray | None]
+        The initial contents of every slot. Slots holding constants (including the constant
+        operands of nodes such as `Power`) are filled in, all other slots are `None`
+    output: int
+        The slot that holds the value of the compiled expression (or of the first expression,
+        for tapes built by `compile_all`)
+    outputs: List[int]
+        The slots that hold the value of every compiled expression
+    """
+
+    def __init__(
+        self,
+        instructions: List[Tuple[int, Tuple[int, ...], int]],
+        variables: List[Tuple[Variable, int]],
+        constants: List[float | np.ndarray | None],
+        output: int,
+        outputs: List[int] | None = None,
+    ):
+        """
+        Parameters
+        ----------
+        instructions: List[Tuple[int, Tuple[int, ...], int]]
+            The `(opcode, input slots, output slot)` record of every operation
+        variables: List[Tuple[Variable, int]]
+            Every variable of the expression along with the slot it is loaded into
+        constants: List[float | np.ndarray | None]
+            The initial contents of every slot
+        output: int
+            The slot that holds the value of the compiled expression
+        outputs: List[int], optional
+            The slots that hold the value of every compiled expression, if several expressions
+            were compiled together. Defaults to `[output]`
+        """
+        self.instructions = instructions
+        self.variables = variables
+        self.constants = constants
+        self.output = output
+        self.outputs = [output] if outputs is None else outputs
+        self._plans: OrderedDict = OrderedDict()
+        self._releases: List[Tuple[int, ...]] | None = None
+
+    def forward(self, values: Dict[Variable, float | np.ndarray]) -> List[float | np.ndarray]:
+        """
+        Runs every instruction of this tape and returns the contents of all slots. Every
+        intermediate is kept, as differentiating the tape (see `gradient.grad`) reads them
+        again, so use `compute` or `compute_all` when only the results are needed
+
+        Parameters
+        ----------
+        values: Dict[Variable, float | np.ndarray]
+            A dictionary of variables and their values, as in `ExpressionBase.compute`
+
+        Returns
+        -------
+        List[float | np.ndarray]
+            The value held by every slot once the tape has been evaluated
+        """
+        slots = list(self.constants)
+        for var, slot in self.variables:
+            slots[slot] = values[var]
+
+        kernels = [cls.kernel for cls in NODE_TYPES]
+        for opcode, inputs, output in self.instructions:
+            slots[output] = kernels[opcode](*[slots[i] for i in inputs])
+
+        return slots
+
+    @property
+    def releases(self) -> List[Tuple[int, ...]]:
+        """
+        The slots that can be freed after each instruction, as no later instruction reads them.
+        The slots of the compiled expressions are never freed
+        """
+        if self._releases is None:
+            last_read = {}
+            for i, (_, inputs, _) in enumerate(self.instructions):
+                for slot in inputs:
+                    last_read[slot] = i
+            for output in self.outputs:
+                last_read.pop(output, None)
+
+            releases = [[] for _ in self.instructions]
+            for slot, i in last_read.items():
+                releases[i].append(slot)
+            self._releases = [tuple(slots) for slots in releases]
+        return self._releases
+
+    def compute(self, values: Dict[Variable, float | np.ndarray]) -> float | np.ndarray:
+        """
+        Returns the compiled expression, evaluated at the given values. This is equivalent to
+        calling `compute` on the original expression.
+
+        Parameters
+        ----------
+        values: Dict[Variable, float | np.ndarray]
+            A dictionary of variables and their values, as in `ExpressionBase.compute`
+
+        Returns
+        -------
+        float | np.ndarray
+            The evaluated point
+        """
+        return self.compute_all(values)[0]
+
+    def compute_all(self, values: Dict[Variable, float | np.ndarray]) -> List[float | np.ndarray]:
+        """
+        Returns every compiled expression, evaluated at the given values. Subexpressions shared
+        between the expressions are only evaluated once, and every intermediate is dropped once
+        its last reader has run (see `releases`), so only the values that are still needed are
+        kept alive.
+
+        Parameters
+        ----------
+        values: Dict[Variable, float | np.ndarray]
+            A dictionary of variables and their values, as in `ExpressionBase.compute`
+
+        Returns
+        -------
+        List[float | np.ndarray]
+            The value of every expression, in the order they were compiled in
+        """
+        slots = list(self.constants)
+        for var, slot in self.variables:
+            slots[slot] = values[var]
+
+        kernels = [cls.kernel for cls in NODE_TYPES]
+        for (opcode, inputs, output), released in zip(self.instructions, self.releases):
+            slots[output] = kernels[opcode](*[slots[i] for i in inputs])
+            for slot in released:
+                slots[slot] = None
+
+        return [slots[output] for output in self.outputs]
+
+    def plan(self, values: Dict[Variable, float | np.ndarray]) -> BufferPlan:
+        """
+        Returns the `BufferPlan` used to evaluate this tape at values with the same shapes and
+        types as `values`. Plans are created on first use and kept with the tape, which keeps
+        the `PLAN_CACHE_SIZE` most recently used plans.
+
+        Parameters
+        ----------
+        values: Dict[Variable, float | np.ndarray]
+            A dictionary of variables and their values, as in `ExpressionBase.compute`
+
+        Returns
+        -------
+        BufferPlan
+            A plan for evaluating this tape at similar values
+        """
+        signature = tuple(_signature(values[var]) for var, _ in self.variables)
+        plan = self._plans.get(signature)
+        if plan is None:
+            plan = BufferPlan(self, values)
+            self._plans[signature] = plan
+            if len(self._plans) > PLAN_CACHE_SIZE:
+                self._plans.popitem(last=False)
+        else:
+            self._plans.move_to_end(signature)
+        return plan
+
+    def compute_buffered(
+        self, values: Dict[Variable, float | np.ndarray], out: np.ndarray | None = None
+    ) -> float | np.ndarray:
+        """
+        Returns the compiled expression, evaluated at the given values, like `compute`. Array
+        intermediates are written into buffers that are reused between instructions and between
+        calls (see `BufferPlan`), so repeatedly evaluating large arrays does not allocate a new
+        array for every node.
+
+        Parameters
+        ----------
+        values: Dict[Variable, float | np.ndarray]
+            A dictionary of variables and their values, as in `ExpressionBase.compute`
+        out: np.ndarray, optional
+            An array that the result should be written into
+
+        Returns
+        -------
+        float | np.ndarray
+            The evaluated point
+        """
+        return self.plan(values).compute(values, out=out)
+
+    def __len__(self) -> int:
+        return len(self.instructions)
+
+    def __getstate__(self) -> dict:
+        # Plans hold buffers that are only useful to the process that allocated them
+        state = self.__dict__.copy()
+        state["_plans"] = OrderedDict()
+        return state
+
+
+class BufferPlan:
+    """
+    A plan for evaluating a `Tape` at values of a given shape and type. A liveness analysis of
+    the tape assigns every array intermediate to a buffer: once the last instruction that reads
+    a slot has run, the slot's buffer is returned to a pool and reused by later instructions
+    that produce an array of the same shape and type. Kernels write into their buffers through
+    their `out` parameter, so the memory used by an evaluation is proportional to the number of
+    intermediates that are alive at once rather than to the number of nodes.
+
+    Buffers are allocated on first use and kept by the plan, so a plan must not be used by
+    several threads at once.
+
+    Attributes
+    ----------
+    tape: Tape
+        The tape that this plan evaluates
+    shapes: List[Tuple[int, ...]]
+        The shape of the value held by every slot
+    dtypes: List[np.dtype | None]
+        The type of the array held by every slot, or `None` for slots holding scalars
+    buffers: List[Tuple[Tuple[int, ...], np.dtype]]
+        The shape and type of every buffer
+    assignment: List[int | None]
+        The buffer that each instruction writes into, or `None` if its result is not buffered
+    shape: Tuple[int, ...]
+        The shape of the result
+    dtype: np.dtype | None
+        The type of the result, or `None` if the result is a scalar
+    """
+
+    def __init__(self, tape: Tape, values: Dict[Variable, float | np.ndarray]):
+        """
+        Parameters
+        ----------
+        tape: Tape
+            The tape to plan the evaluation of
+        values: Dict[Variable, float | np.ndarray]
+            Values of the shapes and types that the plan will be used with
+        """
+        self.tape = tape
+
+        # Evaluating the tape at tiny arrays of the same types reveals the type of every
+        # intermediate, while shapes follow from numpy's broadcasting rules
+        probe = {var: _probe(values[var]) for var, _ in tape.variables}
+        with np.errstate(all="ignore"):
+            probed = tape.forward(probe)
+
+        self.shapes = [np.shape(value) for value in tape.constants]
+        for var, slot in tape.variables:
+            self.shapes[slot] = np.shape(values[var])
+        for _, inputs, output in tape.instructions:
+            self.shapes[output] = np.broadcast_shapes(*(self.shapes[i] for i in inputs))
+        self.dtypes = [
+            value.dtype if isinstance(value, np.ndarray) and shape != () else None
+            for value, shape in zip(probed, self.shapes)
+        ]
+
+        last_use = {}
+        for i, (_, inputs, _) in enumerate(tape.instructions):
+            for slot in inputs:
+                last_use[slot] = i
+
+        self.buffers: List[Tuple[Tuple[int, ...], np.dtype]] = []
+        self.assignment: List[int | None] = []
+        free: Dict[tuple, List[int]] = {}
+        owners: Dict[int, int] = {}
+        # The values of every compiled expression must outlive the evaluation, so they are never
+        # written into pooled buffers
+        results = set(tape.outputs)
+        for i, (_, inputs, output) in enumerate(tape.instructions):
+            buffer = None
+            if output not in results and self.dtypes[output] is not None:
+                spec = (self.shapes[output], self.dtypes[output])
+                if free.get(spec):
+                    buffer = free[spec].pop()
+                else:
+                    buffer = len(self.buffers)
+                    self.buffers.append(spec)
+                owners[output] = buffer
+            self.assignment.append(buffer)
+
+            # The output buffer is picked before releasing the inputs, so that kernels which
+            # make several passes never write over one of their own operands
+            for slot in set(inputs):
+                if last_use[slot] == i and slot in owners:
+                    free.setdefault(self.buffers[owners[slot]], []).append(owners.pop(slot))
+
+        self.shape = self.shapes[tape.output]
+        self.dtype = self.dtypes[tape.output]
+        self._arrays: List[np.ndarray] | None = None
+
+    def compute(
+        self, values: Dict[Variable, float | np.ndarray], out: np.ndarray | None = None
+    ) -> float | np.ndarray:
+        """
+        Returns the tape evaluated at the given values
+
+        Parameters
+        ----------
+        values: Dict[Variable, float | np.ndarray]
+            A dictionary of variables and their values. Every value must have the same shape
+            and type as the values that this plan was created for
+        out: np.ndarray, optional
+            An array that the result should be written into
+
+        Returns
+        -------
+        float | np.ndarray
+            The evaluated point
+        """
+        if self._arrays is None:
+            self._arrays = [np.empty(shape, dtype) for shape, dtype in self.buffers]
+        arrays = self._arrays
+        tape = self.tape
+
+        slots = list(tape.constants)
+        for var, slot in tape.variables:
+            slots[slot] = values[var]
+
+        kernels = [cls.kernel for cls in NODE_TYPES]
+        for (opcode, inputs, output), buffer in zip(tape.instructions, self.assignment):
+            if output == tape.output:
+                target = out
+            else:
+                target = None if buffer is None else arrays[buffer]
+            slots[output] = kernels[opcode](*[slots[i] for i in inputs], out=target)
+
+        result = slots[tape.output]
+        if out is not None and result is not out:
+            # No kernel wrote the result into `out` (for instance, the result is a variable)
+            out[...] = result
+            return out
+        return result
+
+
+def _signature(value: float | np.ndarray) -> tuple | type:
+    """Returns the properties of a value that a `BufferPlan` depends on"""
+    if isinstance(value, np.ndarray):
+        return (value.shape, value.dtype.str)
+    return type(value)
+
+
+def _probe(value: float | np.ndarray) -> float | np.ndarray:
+    """
+    Returns a small value of the same type (and number of dimensions) as `value`, used to find
+    the type of every intermediate
+    """
+    if isinstance(value, np.ndarray):
+        return np.ones((1,) * value.ndim, dtype=value.dtype)
+    return type(value)(1)
+
+
+def compile(expression: ExpressionBase) -> Tape:
+    """
+    Compiles an expression into a `Tape`. The graph is topologically sorted once, so the
+    returned tape can be evaluated any number of times without traversing the graph again.
+
+    Parameters
+    ----------
+    expression: ExpressionBase
+        The expression to compile
+
+    Returns
+    -------
+    Tape
+        A tape that evaluates `expression`
+    """
+    return compile_all([expression])
+
+
+def compile_all(expressions: Sequence[ExpressionBase]) -> Tape:
+    """
+    Compiles several expressions into a single `Tape` whose `outputs` hold the value of each.
+    Nodes shared between the expressions are given a single slot, so they are only evaluated
+    once per evaluation of the tape.
+
+    Parameters
+    ----------
+    expressions: Sequence[ExpressionBase]
+        The expressions to compile
+
+    Returns
+    -------
+    Tape
+        A tape that evaluates every expression (see `Tape.compute_all`)
+    """
+    if not expressions:
+        raise ValueError("At least one expression must be compiled")
+
+    slots: Dict[int, int] = {}
+    constants = []
+    variables = []
+    instructions = []
+
+    def constant_slot(value):
+        constants.append(value)
+        return len(constants) - 1
+
+    for expression in expressions:
+        # Nodes compiled for a previous expression already have a slot, so they are neither
+        # compiled nor traversed again
+        for node in postorder(expression, expand=lambda node: id(node) not in slots):
+            if id(node) in slots:
+                continue
+            if isinstance(node, Variable):
+                slots[id(node)] = constant_slot(None)
+                variables.append((node, slots[id(node)]))
+            elif isinstance(node, Constant):
+                slots[id(node)] = constant_slot(node.value)
+            else:
+                inputs = tuple(
+                    slots[id(op)] if isinstance(op, ExpressionBase) else constant_slot(op)
+                    for op in node.operands()
+                )
+                slots[id(node)] = constant_slot(None)
+                instructions.append((OPCODES[type(node)], inputs, slots[id(node)]))
+
+    outputs = [slots[id(expression)] for expression in expressions]
+    return Tape(instructions, variables, constants, outputs[0], outputs)
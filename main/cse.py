@@ -0,0 +1,89 @@
+"""
+Common-subexpression elimination: rewrites an expression so that structurally equal subtrees are
+represented by a single shared node
+"""
+
+from __future__ import annotations
+from typing import Dict, List, Sequence, Tuple
+
+from main.expression import ExpressionBase, Constant, postorder, payload_key
+
+
+def cse(expression: ExpressionBase) -> Tuple[ExpressionBase, int]:
+    """
+    Rewrites the graph rooted at an expression into a DAG in which every set of equal subtrees
+    (according to `__eq__`, which accounts for the commutativity of sums and products) is
+    replaced by a single node. The graph is processed from the leaves up, so by the time a node
+    is compared, its children have already been merged and comparisons stop at shared children.
+
+    Constants are merged when their values are identical. The original expression is left
+    untouched.
+
+    Parameters
+    ----------
+    expression: ExpressionBase
+        The expression to rewrite
+
+    Returns
+    -------
+    Tuple[ExpressionBase, int]
+        An expression equal to `expression` in which common subexpressions are shared, along
+        with the number of unique nodes that were removed
+    """
+    (result,), removed = cse_all([expression])
+    return result, removed
+
+
+def cse_all(expressions: Sequence[ExpressionBase]) -> Tuple[List[ExpressionBase], int]:
+    """
+    Eliminates common subexpressions from several expressions at once, like `cse`. Equal
+    subtrees are shared across all of the expressions, not only within each of them.
+
+    Parameters
+    ----------
+    expressions: Sequence[ExpressionBase]
+        The expressions to rewrite
+
+    Returns
+    -------
+    Tuple[List[ExpressionBase], int]
+        The rewritten expressions, in the same order, along with the number of unique nodes
+        (across all of the expressions) that were removed
+    """
+    canonical: Dict[ExpressionBase | tuple, ExpressionBase] = {}
+    replacements: Dict[int, ExpressionBase] = {}
+
+    for expression in expressions:
+        # Nodes already rewritten for a previous expression are neither visited again nor
+        # counted twice
+        for node in postorder(expression, expand=lambda node: id(node) not in replacements):
+            if id(node) in replacements:
+                continue
+            if isinstance(node, Constant):
+                # Keying constants on their exact value avoids comparing every pair of
+                # constants, which all share the same structural hash
+                replacements[id(node)] = canonical.setdefault(payload_key(node.value), node)
+                continue
+
+            operands = node.operands()
+            rewritten = tuple(
+                replacements[id(op)] if isinstance(op, ExpressionBase) else op for op in operands
+            )
+            if any(new is not old for new, old in zip(rewritten, operands)):
+                node_copy = type(node)(*rewritten)
+            else:
+                node_copy = node
+
+            replacements[id(node)] = canonical.setdefault(node_copy, node_copy)
+
+    results = [replacements[id(expression)] for expression in expressions]
+    return results, len(replacements) - _count_nodes(results)
+
+
+def _count_nodes(expressions: Sequence[ExpressionBase]) -> int:
+    """Returns the number of unique nodes (compared by identity) of several expressions"""
+    seen = set()
+    for expression in expressions:
+        for node in postorder(expression, expand=lambda node: id(node) not in seen):
+            seen.add(id(node))
+    return len(seen)
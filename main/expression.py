@@ -5,21 +5,79 @@ two fundamental expression types: `Variable` and `Constant`
 
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from typing import Dict, override
+from collections import OrderedDict
+from string import Formatter
+from weakref import WeakValueDictionary, ref
+from typing import Callable, Dict, List, Tuple, override
 import numpy as np
 
+# The maximum number of derivatives kept by `ExpressionBase.backward`. Least recently used
+# derivatives are evicted first
+DERIVATIVE_CACHE_SIZE = 4096
+
+# The maximum number of evaluation schedules kept by `ExpressionBase.compute`. Least recently
+# used schedules are evicted first
+SCHEDULE_CACHE_SIZE = 256
+
+# Splits the templates returned by `ExpressionBase.format`
+_FORMATTER = Formatter()
+
+# Maps the identities of (expression, variable) pairs to the expression, the variable and the
+# derivative of the expression with respect to the variable. Keeping the expression and the
+# variable in the entry keeps them alive, so their identities cannot be reused while cached
+_DERIVATIVE_CACHE: OrderedDict = OrderedDict()
+
+# Maps the identities of evaluated expressions to their schedules (see `_schedule`)
+_SCHEDULE_CACHE: OrderedDict = OrderedDict()
+
+# The relative and absolute tolerances used to compare constants (see `is_close`). They default
+# to those of `np.allclose`, and are changed with `set_constant_tolerance`
+_TOLERANCE: Tuple[float, float] = (1e-05, 1e-08)
+
+# Incremented whenever the tolerances change, so that constants know when to reclassify
+# themselves
+_TOLERANCE_VERSION = 0
+
+# The types of constants that `is_close` compares without going through numpy
+_PYTHON_SCALARS = (int, float, complex)
+
+# The number of elements above which `intern_node` does not intern nodes with array payloads,
+# since keying them would copy and hash every element whenever such a node is built
+INTERN_SIZE_LIMIT = 1 << 12
+
 
 class ExpressionBase(ABC):
     """
     Abstract class that serves as the base for all operations/expressions
     All operations extend this class and implement their respective functionality
     This allows Expressions to be recursively nested inside one another
+
+    Every traversal of an expression (evaluating, differentiating, printing and comparing it)
+    walks the graph with an explicit stack, so the depth of an expression is only limited by
+    memory
+
+    Expressions are immutable, since nodes are shared between graphs (see `intern_node`) and
+    cache their hash. Nodes use `__slots__` rather than a `__dict__` to keep large graphs small,
+    so subclasses must declare the slots of their own attributes and set them in `__init__`
+    with `object.__setattr__`
+
+    Attributes
+    ----------
+    commutative: bool
+        Whether the order of this expression's children is irrelevant when comparing it
     """
 
-    @abstractmethod
+    __slots__ = ("_hash", "__weakref__")
+    commutative = False
+
     def compute(self, values: Dict[Variable, float | np.ndarray]) -> float | np.ndarray:
         """
-        Returns this expression, evaluated at the given values
+        Returns this expression, evaluated at the given values. Every unique node (compared by
+        identity) is only evaluated once, even if it is shared by several parents
+
+        The graph is only sorted on the first evaluation. Its schedule is cached (see
+        `SCHEDULE_CACHE_SIZE`), so evaluating the same expression again is a single loop over
+        its operations
 
         Parameters
         ----------
@@ -34,16 +92,94 @@ class ExpressionBase(ABC):
             The evaluated point, with the same type as the type provided for
             each value in `values`
         """
+        schedule = _SCHEDULE_CACHE.get(id(self))
+        if schedule is None or schedule[0]() is not self:
+            schedule = _schedule(self)
+            _SCHEDULE_CACHE[id(self)] = schedule
+            if len(_SCHEDULE_CACHE) > SCHEDULE_CACHE_SIZE:
+                _SCHEDULE_CACHE.popitem(last=False)
+        else:
+            _SCHEDULE_CACHE.move_to_end(id(self))
+        _, slots, leaves, instructions, output = schedule
+
+        slots = list(slots)
+        for slot, leaf in leaves:
+            slots[slot] = leaf.compute(values)
+        for kernel, inputs, result, dead in instructions:
+            slots[result] = kernel(*[slots[i] for i in inputs])
+            for i in dead:
+                slots[i] = None
+
+        return slots[output]
+
+    def compute_memoized(self, values: Dict[Variable, float | np.ndarray]) -> float | np.ndarray:
+        """
+        Alias of `compute`, which evaluates every shared node only once
+        """
+        return self.compute(values)
 
-    @abstractmethod
     def backward(self, var: Variable) -> ExpressionBase:
         """
         Returns an expression that represents the derivative of this expression
 
+        Derivatives are cached by node identity (see `DERIVATIVE_CACHE_SIZE`), so
+        differentiating the same expression, or an expression that shares nodes with a
+        previously differentiated one, reuses the derivatives that were already built. Since
+        the operation functions intern their nodes (see `intern_node`), equal subexpressions
+        built through them are the same node.
+
+        Parameters
+        ----------
+        var: Variable
+            The variable to differentiate with respect to
+
+        Returns
+        -------
+        ExpressionBase
+            An expression representing the derivative of this expression with
+            respect to `var`
+        """
+        derivatives = {}
+
+        def is_uncached(node: ExpressionBase) -> bool:
+            # Leaves are cheap to differentiate, so they are not cached
+            if not node.operands():
+                return True
+            cached = _DERIVATIVE_CACHE.get((id(node), id(var)))
+            if cached is None:
+                return True
+
+            _DERIVATIVE_CACHE.move_to_end((id(node), id(var)))
+            derivatives[id(node)] = cached[2]
+            return False
+
+        for node in postorder(self, expand=is_uncached):
+            if id(node) in derivatives:
+                continue
+
+            derivative = node.derivative(var, *(derivatives[id(c)] for c in node.children()))
+            derivatives[id(node)] = derivative
+            if node.operands():
+                _DERIVATIVE_CACHE[(id(node), id(var))] = (node, var, derivative)
+                if len(_DERIVATIVE_CACHE) > DERIVATIVE_CACHE_SIZE:
+                    _DERIVATIVE_CACHE.popitem(last=False)
+
+        return derivatives[id(self)]
+
+    @abstractmethod
+    def derivative(self, var: Variable, *derivatives: ExpressionBase) -> ExpressionBase:
+        """
+        Returns an expression that represents the derivative of this expression, given the
+        derivatives of its children. This implements the differentiation rule of each type of
+        expression; use `backward` to differentiate an expression.
+
         Parameters
         ----------
         var: Variable
             The variable to differentiate with respect to
+        *derivatives: ExpressionBase
+            The derivative of each child with respect to `var`, in the same order as
+            `children()`
 
         Returns
         -------
@@ -52,6 +188,226 @@ class ExpressionBase(ABC):
             respect to `var`
         """
 
+    def structurally_equal(self, other: ExpressionBase) -> bool:
+        """
+        Returns true if the contents of this expression, other than its children, match those
+        of `other`. This is only called by `__eq__` once `other` is known to have the same type
+        and structural hash as this expression, and children are compared separately. By
+        default, there is nothing else to compare.
+
+        Parameters
+        ----------
+        other: ExpressionBase
+            An expression of the same type and with the same hash as this one
+
+        Returns
+        -------
+        bool
+            Whether the contents of both expressions are equal
+        """
+        return True
+
+    def format(self) -> str:
+        """
+        Returns a template for the string representation of this expression, in which `{0}`,
+        `{1}`, ... stand for the representations of its children (in the same order as
+        `children()`). Variables and constants override `__repr__` instead.
+        """
+        raise NotImplementedError
+
+    def source(self, *operands: str) -> str:
+        """
+        Returns a Python expression that computes this type of expression, used to generate
+        code for an expression. Variables and constants do not have a source.
+
+        Parameters
+        ----------
+        *operands: str
+            The Python expression (typically a local name) that holds the value of each
+            operand, in the same order as `operands()`. `np` refers to numpy.
+
+        Returns
+        -------
+        str
+            A Python expression that computes this expression from its operands
+        """
+        raise NotImplementedError
+
+    @override
+    def __repr__(self) -> str:
+        parts = []
+        stack = [self]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, str):
+                parts.append(item)
+            elif not item.operands():
+                parts.append(repr(item))
+            else:
+                children = item.children()
+                pieces = []
+                for literal, field, _, _ in _FORMATTER.parse(item.format()):
+                    pieces.append(literal)
+                    if field is not None:
+                        pieces.append(children[int(field)])
+                stack.extend(reversed(pieces))
+
+        return "".join(parts)
+
+    def __eq__(self, other) -> bool:
+        pairs = [(self, other)]
+        while pairs:
+            a, b = pairs.pop()
+            if a is b:
+                continue
+            if type(b) is not type(a) or b._hash != a._hash or not a.structurally_equal(b):
+                return False
+
+            a_children, b_children = a.children(), b.children()
+            if len(a_children) != len(b_children):
+                return False
+            if a.commutative:
+                matched = _match_unordered(a_children, b_children)
+                if matched is None:
+                    return False
+                if matched is _AMBIGUOUS:
+                    # Children cannot be paired up by their hash alone, so both graphs are
+                    # compared as a whole instead
+                    return _canonical_equal(self, other)
+                pairs.extend(matched)
+            else:
+                pairs.extend(zip(a_children, b_children))
+
+        return True
+
+    def __hash__(self) -> int:
+        # Every node caches a structural hash (consistent with `__eq__`) when it is constructed
+        return self._hash
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Cannot set {name!r}: {type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"Cannot delete {name!r}: {type(self).__name__} is immutable")
+
+    def __reduce__(self) -> tuple:
+        # Pickling the graph node by node would recurse once per level, so it is pickled as the
+        # flat buffer written by `serialization.dumps` instead
+        from main.serialization import reduce_expression
+
+        return reduce_expression(self)
+
+    def operands(self) -> Tuple[ExpressionBase | float | np.ndarray, ...]:
+        """
+        Returns the inputs of this expression, in the same order as the parameters of its
+        constructor. Inputs that are not expressions (such as the constant exponent of a
+        `Power`) are returned as is. Variables and constants have no operands.
+
+        Returns
+        -------
+        Tuple[ExpressionBase | float | np.ndarray, ...]
+            The operands of this expression
+        """
+        return ()
+
+    def children(self) -> Tuple[ExpressionBase, ...]:
+        """
+        Returns the operands of this expression that are themselves expressions
+        """
+        return tuple(op for op in self.operands() if isinstance(op, ExpressionBase))
+
+    @staticmethod
+    def kernel(*operands, out=None):
+        """
+        Computes the value of this type of expression from the (already computed) values of
+        its operands. Variables and constants do not have a kernel.
+
+        Parameters
+        ----------
+        *operands: float | np.ndarray
+            The values of each operand, in the same order as `operands()`
+        out: np.ndarray, optional
+            An array that the result should be written into
+
+        Returns
+        -------
+        float | np.ndarray
+            The value of the expression
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def adjoint(grad, out, *operands) -> Tuple[float | np.ndarray | None, ...]:
+        """
+        Propagates an adjoint (the derivative of some output with respect to this expression)
+        back to the operands of this type of expression. This is the reverse-mode counterpart
+        of `kernel`. Variables and constants do not have an adjoint rule.
+
+        Parameters
+        ----------
+        grad: float | np.ndarray
+            The adjoint of this expression
+        out: float | np.ndarray
+            The value of this expression, as returned by `kernel`
+        *operands: float | np.ndarray
+            The values of each operand, in the same order as `operands()`
+
+        Returns
+        -------
+        Tuple[float | np.ndarray | None, ...]
+            The contribution to the adjoint of each operand. Operands that are not
+            expressions receive `None`
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def tangent(tangents, out, *operands) -> float | np.ndarray:
+        """
+        Propagates the tangents (directional derivatives) of the operands of this type of
+        expression forward to the expression itself. This is the forward-mode counterpart of
+        `kernel`. Variables and constants do not have a tangent rule.
+
+        Parameters
+        ----------
+        tangents: Tuple[float | np.ndarray, ...]
+            The tangent of each operand, in the same order as `operands()`. Operands that are
+            not expressions have a tangent of 0
+        out: float | np.ndarray
+            The value of this expression, as returned by `kernel`
+        *operands: float | np.ndarray
+            The values of each operand, in the same order as `operands()`
+
+        Returns
+        -------
+        float | np.ndarray
+            The tangent of this expression
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def taylor(series, *operands) -> np.ndarray:
+        """
+        Propagates truncated Taylor series through this type of expression. Series are stored
+        as arrays whose leading axis holds the normalized coefficients `f^(k)(t) / k!` for
+        `k = 0, ..., K`, and every series shares the same number of dimensions (see
+        `taylor.taylor_coefficients`). Variables and constants do not have a Taylor rule.
+
+        Parameters
+        ----------
+        series: Tuple[np.ndarray | None, ...]
+            The Taylor series of each operand, in the same order as `operands()`. Payloads, such
+            as the exponent of `Power`, are constants, so all of their coefficients but the
+            first are 0
+        *operands: float | np.ndarray
+            The values of each operand, in the same order as `operands()`
+
+        Returns
+        -------
+        np.ndarray
+            The Taylor series of this expression, to the same order
+        """
+        raise NotImplementedError
+
 
 class Variable(ExpressionBase):
     """
@@ -67,6 +423,8 @@ class Variable(ExpressionBase):
     The name of this variable
     """
 
+    __slots__ = ("name",)
+
     def __init__(self, name: str):
         """
         Parameters
@@ -74,34 +432,53 @@ class Variable(ExpressionBase):
         name: str
             The name of this variable (as it should be printed)
         """
-        self.name = name
+        object.__setattr__(self, "name", name)
+        object.__setattr__(self, "_hash", object.__hash__(self))
 
     @override
     def compute(self, values):
         return values[self]
 
     @override
-    def backward(self, var):
-        return Constant(1) if var == self else Constant(0)
+    def derivative(self, var):
+        return intern_node(Constant, 1) if var == self else intern_node(Constant, 0)
+
+    @override
+    def structurally_equal(self, other):
+        # Two variables are only equal if they are the same instance
+        return False
 
     @override
     def __repr__(self) -> str:
         return self.name
 
+    @override
+    def __reduce__(self) -> tuple:
+        return (Variable, (self.name,))
+
 
 class Constant(ExpressionBase):
     """
-    An extension of `ExpressionBase` that represents a constant value.
+    An extension of `ExpressionBase` that represents a constant value. Array values are
+    copied into read-only arrays (see `freeze`), so changing the array that a constant was
+    built from does not change the constant.
 
-    Unlike variables, two constants with the same value (within a tolerance) will
-    be considered equal.
+    Unlike variables, two constants with the same value will be considered equal.
+
+    Whether a constant is zero or one is checked whenever an expression is simplified, so it is
+    classified once when it is created (and again only if the tolerance changes, see
+    `set_constant_tolerance`).
 
     Attributes
     ----------
     value: float | np.ndarray
     The value of this constant
+    is_scalar: bool
+    Whether the value of this constant is a scalar rather than an array
     """
 
+    __slots__ = ("value", "is_scalar", "_classes")
+
     def __init__(self, value: float | np.ndarray):
         """
         Parameters
@@ -109,25 +486,298 @@ class Constant(ExpressionBase):
         value: float | np.ndarray
             The value of this constant,
         """
-        self.value = value
+        value = freeze(value)
+        object.__setattr__(self, "value", value)
+        object.__setattr__(
+            self, "is_scalar", isinstance(value, _PYTHON_SCALARS) or np.ndim(value) == 0
+        )
+        object.__setattr__(self, "_classes", self._classify())
+        object.__setattr__(self, "_hash", hash((Constant, payload_hash(value))))
+
+    def _classify(self) -> Tuple[int, bool, bool]:
+        """Returns the tolerance version along with whether this constant is zero and one"""
+        return (_TOLERANCE_VERSION, is_close(self.value, 0), is_close(self.value, 1))
+
+    @property
+    def is_zero(self) -> bool:
+        """Whether every element of this constant is zero, within the tolerance"""
+        if self._classes[0] != _TOLERANCE_VERSION:
+            object.__setattr__(self, "_classes", self._classify())
+        return self._classes[1]
+
+    @property
+    def is_one(self) -> bool:
+        """Whether every element of this constant is one, within the tolerance"""
+        if self._classes[0] != _TOLERANCE_VERSION:
+            object.__setattr__(self, "_classes", self._classify())
+        return self._classes[2]
 
     @override
     def compute(self, values):
         return self.value
 
     @override
-    def backward(self, var):
-        return Constant(0)
+    def derivative(self, var):
+        return intern_node(Constant, 0)
 
     @override
     def __repr__(self) -> str:
         return f"{self.value}"
 
     @override
-    def __eq__(self, other):
-        if isinstance(other, Constant):
-            return np.allclose(self.value, other.value)
-        return False
+    def __reduce__(self) -> tuple:
+        return (intern_node, (Constant, self.value))
+
+    @override
+    def structurally_equal(self, other):
+        return np.array_equal(other.value, self.value)
+
+
+def _match_unordered(
+    children: Tuple[ExpressionBase, ...], others: Tuple[ExpressionBase, ...]
+) -> List[Tuple[ExpressionBase, ExpressionBase]] | None:
+    """
+    Pairs up the children of two commutative expressions by their structural hash. Returns the
+    pairs that still need to be compared, `None` if the children cannot be equal, or
+    `_AMBIGUOUS` if several children share a hash, in which case they cannot be paired up
+    without comparing them.
+    """
+    by_hash: Dict[int, List[ExpressionBase]] = {}
+    for other in others:
+        by_hash.setdefault(other._hash, []).append(other)
+
+    pairs = []
+    for child in children:
+        candidates = by_hash.get(child._hash)
+        if not candidates:
+            return None
+        if len(candidates) > 1:
+            return _AMBIGUOUS
+        pairs.append((child, candidates.pop()))
+
+    return pairs
+
+
+# Returned by `_match_unordered` when children cannot be paired up by their hash
+_AMBIGUOUS: List = []
+
+
+def _canonical_equal(a: ExpressionBase, b: ExpressionBase) -> bool:
+    """
+    Returns true if two expressions are equal, by labelling every node of both graphs so that
+    two nodes get the same label if, and only if, they are equal. Nodes are labelled from the
+    leaves up, and the labels of the children of commutative nodes are sorted, so a node only
+    needs to be compared (with `structurally_equal`) against the nodes that have the same type,
+    hash and children. Unlike pairing up the children of commutative nodes by trial, this visits
+    every node once, and does not recurse.
+    """
+    labels: Dict[int, int] = {}
+    seen: Dict[tuple, List[Tuple[ExpressionBase, int]]] = {}
+    for root in (a, b):
+        for node in postorder(root, expand=lambda node: id(node) not in labels):
+            if id(node) in labels:
+                continue
+
+            children = [labels[id(child)] for child in node.children()]
+            if node.commutative:
+                children.sort()
+            candidates = seen.setdefault((type(node), node._hash, tuple(children)), [])
+            label = next(
+                (known for other, known in candidates if other.structurally_equal(node)), None
+            )
+            if label is None:
+                label = len(labels)
+                candidates.append((node, label))
+            labels[id(node)] = label
+
+    return labels[id(a)] == labels[id(b)]
+
+
+def _schedule(root: ExpressionBase) -> tuple:
+    """
+    Sorts the graph of an expression into the schedule evaluated by `ExpressionBase.compute`.
+    Every unique node (and every operand that is not an expression) is given a slot, so
+    evaluating the graph is a loop over its operations that never walks the graph. Since nodes
+    are immutable, a schedule stays valid for as long as its expression is alive.
+
+    Parameters
+    ----------
+    root: ExpressionBase
+        The expression to schedule
+
+    Returns
+    -------
+    tuple
+        A weak reference to `root`, the initial contents of every slot (the values of constants
+        and operands that are not expressions), the `(slot, node)` pairs of the other leaves,
+        the `(kernel, input slots, output slot, freed slots)` record of every operation in
+        evaluation order, and the slot of `root`. Each operation frees the slots that no later
+        operation reads, so only the values that are still needed are kept alive
+    """
+    slots = []
+    leaves = []
+    instructions = []
+    slot_of = {}
+    last_reader = {}
+
+    for node in postorder(root):
+        operands = node.operands()
+        if not operands:
+            slot_of[id(node)] = len(slots)
+            if isinstance(node, Constant):
+                slots.append(node.value)
+            else:
+                leaves.append((len(slots), node))
+                slots.append(None)
+            continue
+
+        inputs = []
+        for op in operands:
+            if isinstance(op, ExpressionBase):
+                inputs.append(slot_of[id(op)])
+            else:
+                inputs.append(len(slots))
+                slots.append(op)
+        for i in inputs:
+            last_reader[i] = len(instructions)
+        slot_of[id(node)] = len(slots)
+        instructions.append((node.kernel, tuple(inputs), len(slots)))
+        slots.append(None)
+
+    dead = [[] for _ in instructions]
+    for slot, reader in last_reader.items():
+        dead[reader].append(slot)
+    instructions = [
+        (kernel, inputs, output, tuple(freed))
+        for (kernel, inputs, output), freed in zip(instructions, dead)
+    ]
+    return ref(root), slots, leaves, instructions, slot_of[id(root)]
+
+
+def clear_derivative_cache():
+    """Removes every derivative cached by `ExpressionBase.backward`"""
+    _DERIVATIVE_CACHE.clear()
+
+
+def is_close(value: float | np.ndarray, target: float | np.ndarray) -> bool:
+    """
+    Returns true if `value` equals `target` within the current tolerance. This is equivalent to
+    `np.allclose(value, target)`, but compares Python scalars directly, which is much faster.
+
+    Parameters
+    ----------
+    value: float | np.ndarray
+        The value to compare
+    target: float | np.ndarray
+        The value it should be close to
+
+    Returns
+    -------
+    bool
+        Whether every element of `value` is close to `target`
+    """
+    rtol, atol = _TOLERANCE
+    if type(value) in _PYTHON_SCALARS and type(target) in _PYTHON_SCALARS:
+        return abs(value - target) <= atol + rtol * abs(target)
+    return bool(np.allclose(value, target, rtol=rtol, atol=atol))
+
+
+def set_constant_tolerance(rtol: float = 1e-05, atol: float = 1e-08):
+    """
+    Sets the tolerances used to compare constants when simplifying expressions (for instance,
+    to drop terms that are zero). Expressions themselves are compared exactly, so that equal
+    expressions always have the same hash. Calling this without arguments restores the
+    defaults, which match those of `np.allclose`. Passing zero for both only treats exactly
+    equal values as equal.
+
+    Derivatives are simplified as they are built, so this also clears the derivatives cached
+    by `ExpressionBase.backward` (see `clear_derivative_cache`).
+
+    Parameters
+    ----------
+    rtol: float
+        The relative tolerance
+    atol: float
+        The absolute tolerance
+    """
+    global _TOLERANCE, _TOLERANCE_VERSION
+    _TOLERANCE = (rtol, atol)
+    _TOLERANCE_VERSION += 1
+    clear_derivative_cache()
+
+
+def accumulate(ufunc: np.ufunc, operands, out: np.ndarray | None = None):
+    """
+    Combines two or more values with a binary ufunc (such as `np.add`). After the first step,
+    every operand is accumulated in place into the same array whenever its shape and type
+    allow it, instead of allocating a temporary for every step.
+
+    Parameters
+    ----------
+    ufunc: np.ufunc
+        The ufunc to combine values with
+    operands: Sequence[float | np.ndarray]
+        The values to combine, of which there must be at least two
+    out: np.ndarray, optional
+        An array that the result should be written into
+
+    Returns
+    -------
+    float | np.ndarray
+        The combined value
+    """
+    result = ufunc(operands[0], operands[1], out=out)
+    for operand in operands[2:]:
+        # Operands that are not numpy values (such as the dual numbers used by `gradient.hvp`)
+        # implement the ufunc themselves, so they are never accumulated in place
+        if (
+            isinstance(result, np.ndarray)
+            and isinstance(operand, (np.ndarray, np.generic, int, float, complex))
+            and np.broadcast_shapes(result.shape, np.shape(operand)) == result.shape
+            and np.can_cast(np.result_type(result, operand), result.dtype)
+        ):
+            ufunc(result, operand, out=result)
+        else:
+            result = ufunc(result, operand)
+
+    return result
+
+
+def series_product(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Returns the product of two truncated Taylor series (see `ExpressionBase.taylor`), keeping
+    as many coefficients as the series have
+
+    Parameters
+    ----------
+    a: np.ndarray
+        The coefficients of the first series, along the leading axis
+    b: np.ndarray
+        The coefficients of the second series, along the leading axis
+
+    Returns
+    -------
+    np.ndarray
+        The coefficients of the product
+    """
+    result = np.zeros(np.broadcast_shapes(a.shape, b.shape), dtype=np.result_type(a, b))
+    for k in range(len(result)):
+        for i in range(k + 1):
+            result[k] += a[i] * b[k - i]
+    return result
+
+
+def payload_hash(value: float | np.ndarray) -> int:
+    """
+    Returns a hash of a constant operand (such as the exponent of a `Power`) that is consistent
+    with comparing the operand with `np.array_equal`. Arrays of more than `INTERN_SIZE_LIMIT`
+    elements are only hashed by their shape, so that hashing them stays cheap
+    """
+    if type(value) in _PYTHON_SCALARS:
+        return hash((value,))
+    if np.size(value) > INTERN_SIZE_LIMIT:
+        return hash(np.shape(value))
+    return hash(tuple(np.ravel(value).tolist()))
 
 
 def fmt_as_exp(a: float | np.ndarray | ExpressionBase) -> ExpressionBase:
@@ -137,4 +787,113 @@ def fmt_as_exp(a: float | np.ndarray | ExpressionBase) -> ExpressionBase:
     """
     if isinstance(a, ExpressionBase):
         return a
-    return Constant(a)
+    return intern_node(Constant, a)
+
+
+# Every node built through `intern_node`, keyed on its type and operands. Entries are dropped
+# automatically once the node they refer to is no longer used anywhere else
+_INTERNED: WeakValueDictionary = WeakValueDictionary()
+
+
+def payload_key(value: float | np.ndarray) -> tuple:
+    """
+    Returns a hashable key that identifies a constant value by its exact type and contents
+    """
+    if isinstance(value, (int, float, complex)):
+        return (type(value), repr(value))
+
+    array = np.asarray(value)
+    return (type(value), array.dtype.str, array.shape, array.tobytes())
+
+
+def freeze(value: float | np.ndarray) -> float | np.ndarray:
+    """
+    Returns a read-only array with the same contents as an array, copying it unless it is
+    already read-only and owns its data. Other values are returned unchanged. Nodes freeze
+    their array payloads, since nodes are shared (see `intern_node`) and must never change.
+    """
+    if not isinstance(value, np.ndarray) or (not value.flags.writeable and value.flags.owndata):
+        return value
+
+    value = value.copy()
+    value.setflags(write=False)
+    return value
+
+
+def intern_node(cls: type, *operands) -> ExpressionBase:
+    """
+    Returns a node of type `cls` with the given operands, reusing an existing node if one with
+    the same type and operands (compared by identity for expressions and by exact value for
+    constant payloads) is still alive. Building the same subexpression twice therefore returns
+    the same object, so graphs built through the operation functions are DAGs rather than trees.
+
+    Array payloads are frozen (see `freeze`) before being keyed, so a node cannot be changed
+    through the array it was built from. Nodes with payloads of more than `INTERN_SIZE_LIMIT`
+    elements are built without being interned.
+
+    Parameters
+    ----------
+    cls: type
+        The type of node to build
+    *operands: ExpressionBase | float | np.ndarray
+        The operands of the node, in the same order as the parameters of its constructor
+
+    Returns
+    -------
+    ExpressionBase
+        The interned node
+    """
+    operands = tuple(op if isinstance(op, ExpressionBase) else freeze(op) for op in operands)
+    if any(np.size(op) > INTERN_SIZE_LIMIT for op in operands if isinstance(op, np.ndarray)):
+        return cls(*operands)
+
+    key = (cls, *(id(op) if isinstance(op, ExpressionBase) else payload_key(op) for op in operands))
+    node = _INTERNED.get(key)
+    if node is None:
+        node = cls(*operands)
+        _INTERNED[key] = node
+    return node
+
+
+def postorder(
+    root: ExpressionBase, expand: Callable[[ExpressionBase], bool] | None = None
+) -> List[ExpressionBase]:
+    """
+    Returns every unique node (compared by identity) of the graph rooted at `root`, ordered so
+    that each node appears after all of its children. The graph is walked with an explicit
+    stack, so its depth is not limited by the recursion limit.
+
+    Parameters
+    ----------
+    root: ExpressionBase
+        The expression whose graph should be sorted
+    expand: Callable[[ExpressionBase], bool], optional
+        Called once for every node. Nodes for which it returns false are still included,
+        but their children are not visited through them
+
+    Returns
+    -------
+    List[ExpressionBase]
+        The nodes of the graph in topological order, ending with `root`
+    """
+    order = []
+    visited = set()
+    stack = [(root, False)]
+
+    while stack:
+        node, expanded = stack.pop()
+        if expanded:
+            order.append(node)
+            continue
+        if id(node) in visited:
+            continue
+
+        visited.add(id(node))
+        stack.append((node, True))
+        if expand is not None and not expand(node):
+            continue
+        for child in reversed(node.children()):
+            if id(child) not in visited:
+                stack.append((child, False))
+
+    return order
@@ -0,0 +1,88 @@
+"""
+Numeric forward-mode differentiation. `jvp` pushes (value, tangent) pairs through a compiled
+`Tape`, so a directional derivative costs a single evaluation instead of building and
+evaluating `ExpressionBase.backward` graphs
+"""
+
+from __future__ import annotations
+from typing import Dict, List, Tuple
+import numpy as np
+
+from main.expression import ExpressionBase, Variable
+from main.compiler import NODE_TYPES, Tape, compile
+
+
+def forward_sweep(
+    tape: Tape,
+    slots: List[float | np.ndarray],
+    seeds: Dict[int, float | np.ndarray],
+) -> List[float | np.ndarray | None]:
+    """
+    Propagates tangents from the start of a tape to its end
+
+    Parameters
+    ----------
+    tape: Tape
+        The tape to sweep over
+    slots: List[float | np.ndarray]
+        The value of every slot, as returned by `Tape.forward`
+    seeds: Dict[int, float | np.ndarray]
+        The tangent of each seeded slot
+
+    Returns
+    -------
+    List[float | np.ndarray | None]
+        The tangent of every slot, or `None` for slots that do not depend on any seed
+    """
+    tangents = [None] * len(slots)
+    for slot, seed in seeds.items():
+        tangents[slot] = seed
+
+    for opcode, inputs, output in tape.instructions:
+        operand_tangents = [tangents[i] for i in inputs]
+        if all(t is None for t in operand_tangents):
+            continue
+
+        operand_tangents = tuple(0.0 if t is None else t for t in operand_tangents)
+        args = [slots[i] for i in inputs]
+        tangents[output] = NODE_TYPES[opcode].tangent(operand_tangents, slots[output], *args)
+
+    return tangents
+
+
+def jvp(
+    expression: ExpressionBase | Tape,
+    values: Dict[Variable, float | np.ndarray],
+    tangents: Dict[Variable, float | np.ndarray],
+) -> Tuple[float | np.ndarray, float | np.ndarray]:
+    """
+    Evaluates an expression along with its directional derivative (a Jacobian-vector product)
+    using forward-mode accumulation.
+
+    Tangents are combined with values using numpy broadcasting, so several directions can be
+    evaluated at once by giving every tangent an extra leading axis. For instance, with values
+    of shape `(n,)`, tangents of shape `(k, n)` produce a derivative of shape `(k, n)` holding
+    one directional derivative per row.
+
+    Parameters
+    ----------
+    expression: ExpressionBase | Tape
+        The expression to differentiate. Passing a compiled `Tape` skips compilation
+    values: Dict[Variable, float | np.ndarray]
+        A dictionary of variables and their values at the point where the expression should
+        be evaluated
+    tangents: Dict[Variable, float | np.ndarray]
+        The direction to differentiate in, given as the tangent of each variable. Variables
+        that are left out have a tangent of 0
+
+    Returns
+    -------
+    Tuple[float | np.ndarray, float | np.ndarray]
+        The value of the expression and its derivative in the given direction
+    """
+    tape = expression if isinstance(expression, Tape) else compile(expression)
+    slots = tape.forward(values)
+    seeds = {slot: tangents[var] for var, slot in tape.variables if var in tangents}
+
+    tangent = forward_sweep(tape, slots, seeds)[tape.output]
+    return slots[tape.output], 0.0 if tangent is None else tangent
@@ -0,0 +1,263 @@
+"""
+Numeric reverse-mode differentiation. Unlike `ExpressionBase.backward`, which builds a new
+expression for a single variable, `grad` computes the partial derivatives with respect to every
+requested variable from one forward and one backward sweep over a compiled `Tape`. `hvp` runs
+the same sweeps over dual numbers to compute Hessian-vector products
+"""
+
+from __future__ import annotations
+from typing import Dict, List, Sequence
+import numpy as np
+
+from main.expression import ExpressionBase, Variable
+from main.compiler import NODE_TYPES, Tape, compile
+
+
+def backward_sweep(
+    tape: Tape, slots: List[float | np.ndarray], seeds: Dict[int, float | np.ndarray]
+) -> List[float | np.ndarray]:
+    """
+    Accumulates adjoints from the end of a tape back to its start
+
+    Parameters
+    ----------
+    tape: Tape
+        The tape to sweep over
+    slots: List[float | np.ndarray]
+        The value of every slot, as returned by `Tape.forward`
+    seeds: Dict[int, float | np.ndarray]
+        The initial adjoint of each seeded slot
+
+    Returns
+    -------
+    List[float | np.ndarray]
+        The adjoint of every slot. Slots that the seeds do not depend on have an adjoint of 0
+    """
+    adjoints = [None] * len(slots)
+    for slot, seed in seeds.items():
+        adjoints[slot] = seed
+
+    for opcode, inputs, output in reversed(tape.instructions):
+        grad = adjoints[output]
+        if grad is None:
+            continue
+
+        args = [slots[i] for i in inputs]
+        contributions = NODE_TYPES[opcode].adjoint(grad, slots[output], *args)
+        for slot, contribution in zip(inputs, contributions):
+            if contribution is None:
+                continue
+            if adjoints[slot] is None:
+                adjoints[slot] = contribution
+            else:
+                adjoints[slot] = adjoints[slot] + contribution
+
+    return [0.0 if adjoint is None else adjoint for adjoint in adjoints]
+
+
+def grad(
+    expression: ExpressionBase | Tape,
+    values: Dict[Variable, float | np.ndarray],
+    wrt: Sequence[Variable],
+) -> List[float | np.ndarray]:
+    """
+    Returns the partial derivatives of an expression with respect to several variables using
+    reverse-mode accumulation. The expression is evaluated once, after which a single backward
+    sweep over its intermediates yields every partial, so the cost does not grow with the
+    number of variables.
+
+    Parameters
+    ----------
+    expression: ExpressionBase | Tape
+        The expression to differentiate. Passing a compiled `Tape` skips compilation, which is
+        useful when the gradient is needed at many points
+    values: Dict[Variable, float | np.ndarray]
+        A dictionary of variables and their values at the point where the gradient should be
+        evaluated. If values are numpy arrays, the partials are computed element-wise
+    wrt: Sequence[Variable]
+        The variables to differentiate with respect to
+
+    Returns
+    -------
+    List[float | np.ndarray]
+        The partial derivative with respect to each variable in `wrt`, in the same order. A
+        variable that the expression does not depend on has a partial derivative of 0
+    """
+    tape = expression if isinstance(expression, Tape) else compile(expression)
+    slots = tape.forward(values)
+    adjoints = backward_sweep(tape, slots, {tape.output: 1.0})
+
+    var_slots = {var: slot for var, slot in tape.variables}
+    return [adjoints[var_slots[var]] if var in var_slots else 0.0 for var in wrt]
+
+
+class Dual:
+    """
+    A dual number `value + tangent * e` (where `e^2 = 0`), used to differentiate the forward and
+    backward sweeps of a tape in a given direction. Duals implement the numpy ufuncs used by the
+    kernels and adjoint rules of every node, so those rules run on duals unchanged. A tangent of
+    `None` stands for a tangent of zero.
+
+    Attributes
+    ----------
+    value: float | np.ndarray
+        The value of this number
+    tangent: float | np.ndarray | None
+        The derivative of this number in the direction being differentiated
+    """
+
+    __slots__ = ("value", "tangent")
+
+    def __init__(self, value: float | np.ndarray, tangent: float | np.ndarray | None):
+        """
+        Parameters
+        ----------
+        value: float | np.ndarray
+            The value of this number
+        tangent: float | np.ndarray | None
+            The derivative of this number in the direction being differentiated
+        """
+        self.value = value
+        self.tangent = tangent
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        rule = _DUAL_RULES.get(ufunc)
+        if method != "__call__" or rule is None or kwargs.get("out") is not None:
+            return NotImplemented
+
+        values = [x.value if isinstance(x, Dual) else x for x in inputs]
+        tangents = [x.tangent if isinstance(x, Dual) else None for x in inputs]
+        value = ufunc(*values)
+        return Dual(value, rule(value, values, tangents))
+
+    def __add__(self, other):
+        return np.add(self, other)
+
+    def __radd__(self, other):
+        return np.add(other, self)
+
+    def __sub__(self, other):
+        return np.subtract(self, other)
+
+    def __rsub__(self, other):
+        return np.subtract(other, self)
+
+    def __mul__(self, other):
+        return np.multiply(self, other)
+
+    def __rmul__(self, other):
+        return np.multiply(other, self)
+
+    def __truediv__(self, other):
+        return np.divide(self, other)
+
+    def __rtruediv__(self, other):
+        return np.divide(other, self)
+
+    def __pow__(self, other):
+        return np.power(self, other)
+
+    def __rpow__(self, other):
+        return np.power(other, self)
+
+    def __neg__(self):
+        return np.negative(self)
+
+
+def _add_tangents(a, b):
+    """Adds two tangents, either of which may be `None`"""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return a + b
+
+
+def _scale(tangent, factor):
+    """Multiplies a tangent, which may be `None`, by a factor"""
+    return None if tangent is None else tangent * factor
+
+
+def _power_tangent(value, values, tangents):
+    """Returns the tangent of `np.power(base, power)`"""
+    base, power = values
+    dbase, dpower = tangents
+    # Each term is only computed when needed, so that raising a negative base to a constant
+    # power does not take the logarithm of the base
+    tangent = None
+    if dbase is not None:
+        tangent = dbase * power * np.power(base, power - 1)
+    if dpower is not None:
+        tangent = _add_tangents(tangent, dpower * value * np.log(base))
+    return tangent
+
+
+# The tangent of the result of every ufunc supported by `Dual`, given the result, the values of
+# the inputs and their tangents
+_DUAL_RULES = {
+    np.add: lambda value, values, tangents: _add_tangents(*tangents),
+    np.subtract: lambda value, values, tangents: _add_tangents(
+        tangents[0], _scale(tangents[1], -1)
+    ),
+    np.multiply: lambda value, values, tangents: _add_tangents(
+        _scale(tangents[0], values[1]), _scale(tangents[1], values[0])
+    ),
+    np.divide: lambda value, values, tangents: _scale(
+        _add_tangents(tangents[0], _scale(tangents[1], -value)), 1 / values[1]
+    ),
+    np.power: _power_tangent,
+    np.log: lambda value, values, tangents: _scale(tangents[0], 1 / values[0]),
+    np.exp: lambda value, values, tangents: _scale(tangents[0], value),
+    np.negative: lambda value, values, tangents: _scale(tangents[0], -1),
+}
+
+
+def hvp(
+    expression: ExpressionBase | Tape,
+    values: Dict[Variable, float | np.ndarray],
+    v: Dict[Variable, float | np.ndarray],
+    wrt: Sequence[Variable] | None = None,
+) -> List[float | np.ndarray]:
+    """
+    Returns the product of the Hessian of an expression with a vector, without building the
+    Hessian. This uses forward-over-reverse differentiation: the forward and backward sweeps of
+    `grad` are run on dual numbers whose tangents hold the direction `v`, so the tangents of the
+    resulting gradient are the derivative of the gradient in direction `v`, which is the
+    Hessian-vector product. This costs a small constant multiple of computing the gradient.
+
+    Parameters
+    ----------
+    expression: ExpressionBase | Tape
+        The expression to differentiate. Passing a compiled `Tape` skips compilation
+    values: Dict[Variable, float | np.ndarray]
+        A dictionary of variables and their values at the point where the Hessian should be
+        evaluated. If values are numpy arrays, the product is computed element-wise
+    v: Dict[Variable, float | np.ndarray]
+        The vector to multiply the Hessian with, given as a component for each variable.
+        Variables that are left out have a component of 0
+    wrt: Sequence[Variable], optional
+        The variables of the components of the product to return. Defaults to the variables
+        of `v`
+
+    Returns
+    -------
+    List[float | np.ndarray]
+        The component of the Hessian-vector product for each variable in `wrt`, in the same
+        order
+    """
+    tape = expression if isinstance(expression, Tape) else compile(expression)
+    wrt = list(v) if wrt is None else wrt
+
+    duals = {var: Dual(value, v[var]) if var in v else value for var, value in values.items()}
+    slots = tape.forward(duals)
+    adjoints = backward_sweep(tape, slots, {tape.output: 1.0})
+
+    var_slots = {var: slot for var, slot in tape.variables}
+    products = []
+    for var in wrt:
+        adjoint = adjoints[var_slots[var]] if var in var_slots else None
+        if isinstance(adjoint, Dual) and adjoint.tangent is not None:
+            products.append(adjoint.tangent)
+        else:
+            products.append(0.0)
+    return products
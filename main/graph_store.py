@@ -0,0 +1,381 @@
+"""
+Includes `GraphStore`, which holds an expression graph as flat numpy arrays instead of as one
+Python object per node
+"""
+
+from __future__ import annotations
+from array import array
+from typing import Dict, List, Sequence
+import numpy as np
+
+from main.expression import ExpressionBase, Variable, Constant, intern_node, payload_key, postorder
+from main.compiler import NODE_TYPES, OPCODES, Tape
+from main.gradient import grad
+
+
+class GraphStore:
+    """
+    An expression graph stored as a struct of arrays. Every node is a row of the arrays, and
+    nodes are topologically sorted, so each node comes after all of its operands and the last
+    node is the root. The operands of a node are stored in compressed sparse row form: a
+    non-negative operand is the index of another node, while a negative operand `-1 - k` refers
+    to entry `k` of the constant pool (constants, as well as the payloads of nodes such as
+    `Power`).
+
+    Evaluating and numerically differentiating the graph are loops over indices that never
+    create node objects, and `GraphBuilder` builds a store row by row, so a graph can be built,
+    evaluated and differentiated without ever creating a Python object per node. Nodes are only
+    materialized as (full, interned) `ExpressionBase` objects when requested through `node` (or
+    `root`), and are then kept by the store. Symbolic differentiation (`backward`) and
+    simplification are only available on materialized nodes.
+
+    Attributes
+    ----------
+    opcodes: np.ndarray
+        The opcode of every node (see `compiler.NODE_TYPES`)
+    offsets: np.ndarray
+        The operands of node `i` are `operands[offsets[i]:offsets[i + 1]]`
+    operands: np.ndarray
+        The operands of every node, one after the other
+    constants: List[float | np.ndarray]
+        The constant pool
+    variables: List[Variable]
+        The variables of the graph, in the order of their nodes
+    symbols: np.ndarray
+        The index in `variables` of every variable node, or -1 for other nodes
+    """
+
+    def __init__(
+        self,
+        opcodes: np.ndarray,
+        offsets: np.ndarray,
+        operands: np.ndarray,
+        constants: List[float | np.ndarray],
+        variables: Sequence[Variable],
+    ):
+        """
+        Parameters
+        ----------
+        opcodes: np.ndarray
+            The opcode of every node, in topological order
+        offsets: np.ndarray
+            The start of the operands of every node in `operands`, followed by their end
+        operands: np.ndarray
+            The operands of every node, as node indices or negative constant pool indices
+        constants: List[float | np.ndarray]
+            The constant pool
+        variables: Sequence[Variable]
+            The variable of every variable node, in order
+        """
+        self.opcodes = np.asarray(opcodes, dtype=np.uint8)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.operands = np.asarray(operands, dtype=np.int64)
+        self.constants = list(constants)
+        self.variables = list(variables)
+
+        is_variable = self.opcodes == OPCODES[Variable]
+        if np.count_nonzero(is_variable) != len(self.variables):
+            raise ValueError(
+                f"The graph has {np.count_nonzero(is_variable)} variable nodes, "
+                f"but {len(self.variables)} variables were given"
+            )
+        self.symbols = np.full(len(self.opcodes), -1, dtype=np.int64)
+        self.symbols[is_variable] = np.arange(len(self.variables))
+
+        self._nodes: List[ExpressionBase | None] = [None] * len(self.opcodes)
+
+    @classmethod
+    def from_expression(cls, expression: ExpressionBase) -> GraphStore:
+        """
+        Stores the graph of an expression. Every unique node (compared by identity) becomes one
+        row, and identical constant values share one entry of the constant pool.
+
+        Parameters
+        ----------
+        expression: ExpressionBase
+            The expression to store
+
+        Returns
+        -------
+        GraphStore
+            The stored graph, whose root is `expression`
+        """
+        nodes = postorder(expression)
+        index = {id(node): i for i, node in enumerate(nodes)}
+
+        pool: Dict[tuple, int] = {}
+        constants = []
+
+        def constant_index(value) -> int:
+            key = payload_key(value)
+            if key not in pool:
+                pool[key] = len(constants)
+                constants.append(value)
+            return -1 - pool[key]
+
+        variables = []
+        opcodes = np.empty(len(nodes), dtype=np.uint8)
+        offsets = np.zeros(len(nodes) + 1, dtype=np.int64)
+        operands = []
+        for i, node in enumerate(nodes):
+            opcodes[i] = OPCODES[type(node)]
+            if isinstance(node, Variable):
+                variables.append(node)
+            elif isinstance(node, Constant):
+                operands.append(constant_index(node.value))
+            else:
+                operands.extend(
+                    index[id(op)] if isinstance(op, ExpressionBase) else constant_index(op)
+                    for op in node.operands()
+                )
+            offsets[i + 1] = len(operands)
+
+        store = cls(opcodes, offsets, operands, constants, variables)
+        store._nodes = nodes
+        return store
+
+    def __len__(self) -> int:
+        return len(self.opcodes)
+
+    def children(self, i: int) -> np.ndarray:
+        """
+        Returns the indices of the nodes that are operands of node `i`
+        """
+        operands = self.operands[self.offsets[i] : self.offsets[i + 1]]
+        return operands[operands >= 0]
+
+    def node(self, i: int) -> ExpressionBase:
+        """
+        Returns node `i` as an expression. The node and any of its descendants that have not
+        been requested yet are built with `intern_node`, so they are shared with equal nodes
+        that already exist.
+
+        Parameters
+        ----------
+        i: int
+            The index of the node
+
+        Returns
+        -------
+        ExpressionBase
+            The node
+        """
+        nodes = self._nodes
+        offsets = self.offsets
+        operands = self.operands
+
+        stack = [i]
+        while stack:
+            j = stack[-1]
+            if nodes[j] is not None:
+                stack.pop()
+                continue
+
+            args = operands[offsets[j] : offsets[j + 1]].tolist()
+            missing = [k for k in args if k >= 0 and nodes[k] is None]
+            if missing:
+                stack.extend(missing)
+                continue
+
+            stack.pop()
+            cls = NODE_TYPES[self.opcodes[j]]
+            if cls is Variable:
+                nodes[j] = self.variables[self.symbols[j]]
+            else:
+                nodes[j] = intern_node(
+                    cls, *(nodes[k] if k >= 0 else self.constants[-1 - k] for k in args)
+                )
+
+        return nodes[i]
+
+    @property
+    def root(self) -> ExpressionBase:
+        """The expression represented by this graph"""
+        return self.node(len(self) - 1)
+
+    def compute(self, values: Dict[Variable, float | np.ndarray]) -> float | np.ndarray:
+        """
+        Returns the stored expression, evaluated at the given values. The value of every node is
+        dropped once every node that reads it has been evaluated
+
+        Parameters
+        ----------
+        values: Dict[Variable, float | np.ndarray]
+            A dictionary of variables and their values, as in `ExpressionBase.compute`
+
+        Returns
+        -------
+        float | np.ndarray
+            The evaluated point
+        """
+        opcodes = self.opcodes.tolist()
+        offsets = self.offsets.tolist()
+        operands = self.operands.tolist()
+        symbols = self.symbols.tolist()
+        constants = self.constants
+        kernels = [cls.kernel for cls in NODE_TYPES]
+        variable, constant = OPCODES[Variable], OPCODES[Constant]
+
+        uses = np.bincount(self.operands[self.operands >= 0], minlength=len(self)).tolist()
+        results: List[float | np.ndarray | None] = [None] * len(opcodes)
+        for i, opcode in enumerate(opcodes):
+            args = operands[offsets[i] : offsets[i + 1]]
+            if opcode == variable:
+                results[i] = values[self.variables[symbols[i]]]
+                continue
+            if opcode == constant:
+                results[i] = constants[-1 - args[0]]
+                continue
+
+            results[i] = kernels[opcode](
+                *(results[k] if k >= 0 else constants[-1 - k] for k in args)
+            )
+            for k in args:
+                if k >= 0:
+                    uses[k] -= 1
+                    if uses[k] == 0:
+                        results[k] = None
+
+        return results[-1]
+
+    def to_tape(self) -> Tape:
+        """
+        Returns a `Tape` that evaluates the stored expression. Node `i` is held in slot `i`, and
+        entry `k` of the constant pool in slot `len(self) + k`.
+
+        Returns
+        -------
+        Tape
+            A tape that evaluates the root of this graph
+        """
+        size = len(self)
+        opcodes = self.opcodes.tolist()
+        offsets = self.offsets.tolist()
+        # Constant pool entry `k` (operand `-1 - k`) is held in slot `size + k`
+        slots = np.where(self.operands >= 0, self.operands, size - 1 - self.operands).tolist()
+
+        variable, constant = OPCODES[Variable], OPCODES[Constant]
+        contents = [None] * size + self.constants
+        variables = []
+        instructions = []
+        for i, opcode in enumerate(opcodes):
+            inputs = tuple(slots[offsets[i] : offsets[i + 1]])
+            if opcode == variable:
+                variables.append((self.variables[self.symbols[i]], i))
+            elif opcode == constant:
+                contents[i] = contents[inputs[0]]
+            else:
+                instructions.append((opcode, inputs, i))
+
+        return Tape(instructions, variables, contents, size - 1)
+
+    def grad(
+        self, values: Dict[Variable, float | np.ndarray], wrt: Sequence[Variable]
+    ) -> List[float | np.ndarray]:
+        """
+        Returns the partial derivatives of the stored expression with respect to several
+        variables, using one forward and one backward sweep over `to_tape` (see
+        `gradient.grad`)
+
+        Parameters
+        ----------
+        values: Dict[Variable, float | np.ndarray]
+            A dictionary of variables and their values
+        wrt: Sequence[Variable]
+            The variables to differentiate with respect to
+
+        Returns
+        -------
+        List[float | np.ndarray]
+            The partial derivative with respect to each variable in `wrt`, in the same order
+        """
+        return grad(self.to_tape(), values, wrt)
+
+
+class GraphBuilder:
+    """
+    Builds a `GraphStore` one node at a time, without creating an `ExpressionBase` object for
+    every node. Every node is referred to by the index returned when it was added, and entries
+    of the constant pool by the negative index returned by `payload`, just as in the operands of
+    a `GraphStore`. Nodes are stored exactly as given: unlike the operation functions, the
+    builder neither simplifies nodes nor merges equal ones.
+    """
+
+    def __init__(self):
+        self._opcodes = array("B")
+        self._offsets = array("q", [0])
+        self._operands = array("q")
+        self._constants: List[float | np.ndarray] = []
+        self._pool: Dict[tuple, int] = {}
+        self._variables: List[Variable] = []
+
+    def __len__(self) -> int:
+        return len(self._opcodes)
+
+    def payload(self, value: float | np.ndarray) -> int:
+        """
+        Adds a value to the constant pool, unless an identical value is already in it, and
+        returns the (negative) operand that refers to it. Payloads are passed to `add` as the
+        constant operands of nodes such as `Power`
+        """
+        key = payload_key(value)
+        if key not in self._pool:
+            self._pool[key] = len(self._constants)
+            self._constants.append(value)
+        return -1 - self._pool[key]
+
+    def variable(self, var: Variable) -> int:
+        """Adds a variable node and returns its index"""
+        self._variables.append(var)
+        return self._append(OPCODES[Variable], ())
+
+    def constant(self, value: float | np.ndarray) -> int:
+        """Adds a constant node and returns its index"""
+        return self._append(OPCODES[Constant], (self.payload(value),))
+
+    def add(self, cls: type, *operands: int) -> int:
+        """
+        Adds a node and returns its index
+
+        Parameters
+        ----------
+        cls: type
+            The type of the node, which must be one of `compiler.NODE_TYPES` other than
+            `Variable` and `Constant`
+        *operands: int
+            The operands of the node, in the same order as the parameters of its constructor.
+            Each is either the index of a node that was already added or an operand returned by
+            `payload`
+
+        Returns
+        -------
+        int
+            The index of the new node
+        """
+        if cls not in OPCODES or cls is Variable or cls is Constant:
+            raise ValueError(f"Cannot add a node of type {cls.__name__}")
+        for operand in operands:
+            if not -len(self._constants) <= operand < len(self):
+                raise ValueError(f"Operand {operand} does not refer to an existing node or payload")
+        return self._append(OPCODES[cls], operands)
+
+    def _append(self, opcode: int, operands) -> int:
+        """Appends a node with the given opcode and operands, and returns its index"""
+        self._opcodes.append(opcode)
+        self._operands.extend(operands)
+        self._offsets.append(len(self._operands))
+        return len(self) - 1
+
+    def build(self) -> GraphStore:
+        """
+        Returns the graph built so far, whose root is the last node that was added
+        """
+        if not len(self):
+            raise ValueError("Cannot build an empty graph")
+        return GraphStore(
+            np.array(self._opcodes, dtype=np.uint8),
+            np.array(self._offsets, dtype=np.int64),
+            np.array(self._operands, dtype=np.int64),
+            self._constants,
+            self._variables,
+        )
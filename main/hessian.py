@@ -0,0 +1,117 @@
+"""
+Builds the full Hessian of an expression as a single compiled graph, sharing work between all of
+its entries
+"""
+
+from __future__ import annotations
+from typing import Dict, List, Sequence, Tuple
+import numpy as np
+
+from main.expression import ExpressionBase, Variable
+from main.compiler import Tape, compile_all
+from main.cse import cse_all
+
+
+class Hessian:
+    """
+    The Hessian of an expression with respect to several variables, compiled so that it can be
+    evaluated at any number of points. Only the upper triangle is built, since the Hessian is
+    symmetric. Each entry is the derivative of one of the first derivatives, and every
+    derivative is built by `ExpressionBase.backward`, whose cache shares the subexpressions
+    common to different entries. All entries are then compiled into a single tape, so nodes
+    shared between entries are evaluated once per evaluation.
+
+    Attributes
+    ----------
+    wrt: List[Variable]
+        The variables that the Hessian is taken with respect to
+    entries: List[ExpressionBase]
+        The entries of the upper triangle, row by row
+    indices: List[Tuple[int, int]]
+        The row and column of every entry of `entries`
+    tape: Tape
+        The compiled entries
+    """
+
+    def __init__(
+        self, expression: ExpressionBase, wrt: Sequence[Variable], eliminate_common: bool = True
+    ):
+        """
+        Parameters
+        ----------
+        expression: ExpressionBase
+            The expression to differentiate
+        wrt: Sequence[Variable]
+            The variables to differentiate with respect to
+        eliminate_common: bool
+            Whether to merge equal subexpressions across all entries (see `cse.cse_all`)
+            before compiling them
+        """
+        self.wrt = list(wrt)
+        gradient = [expression.backward(var) for var in self.wrt]
+
+        self.indices: List[Tuple[int, int]] = []
+        entries = []
+        for i, first in enumerate(gradient):
+            for j in range(i, len(self.wrt)):
+                self.indices.append((i, j))
+                entries.append(first.backward(self.wrt[j]))
+
+        if eliminate_common and entries:
+            entries, _ = cse_all(entries)
+        self.entries = entries
+        self.tape = compile_all(entries) if entries else None
+
+    def compute(self, values: Dict[Variable, float | np.ndarray]) -> np.ndarray:
+        """
+        Returns the Hessian evaluated at the given values
+
+        Parameters
+        ----------
+        values: Dict[Variable, float | np.ndarray]
+            A dictionary of variables and their values. If values are numpy arrays, every entry
+            is computed element-wise
+
+        Returns
+        -------
+        np.ndarray
+            An array of shape `(N, N, *batch)`, where `N` is the number of variables and
+            `batch` is the broadcast shape of the values of the entries and variables
+        """
+        size = len(self.wrt)
+        results = self.tape.compute_all(values) if self.tape is not None else []
+
+        batch = np.broadcast_shapes(
+            *(np.shape(result) for result in results),
+            *(np.shape(values[var]) for var in self.wrt if var in values),
+        )
+        hessian = np.zeros((size, size, *batch), dtype=np.result_type(float, *results))
+        for (i, j), result in zip(self.indices, results):
+            hessian[i, j] = result
+            hessian[j, i] = result
+
+        return hessian
+
+
+def hessian(
+    expression: ExpressionBase, wrt: Sequence[Variable], eliminate_common: bool = True
+) -> Hessian:
+    """
+    Returns the Hessian of an expression with respect to several variables, compiled into a
+    single graph (see `Hessian`)
+
+    Parameters
+    ----------
+    expression: ExpressionBase
+        The expression to differentiate
+    wrt: Sequence[Variable]
+        The variables to differentiate with respect to
+    eliminate_common: bool
+        Whether to merge equal subexpressions across all entries before compiling them
+
+    Returns
+    -------
+    Hessian
+        The Hessian, which can be evaluated with `Hessian.compute`
+    """
+    return Hessian(expression, wrt, eliminate_common)
@@ -0,0 +1,344 @@
+"""
+Computes the Jacobian of several expressions with respect to several variables, sharing a single
+evaluation of the expressions between every entry. Sparse Jacobians are computed from their
+structural sparsity pattern, with compressed sweeps
+"""
+
+from __future__ import annotations
+from typing import Dict, List, Sequence, Tuple
+import numpy as np
+
+from main.expression import ExpressionBase, Variable
+from main.compiler import Tape, compile_all
+from main.forward import forward_sweep
+from main.gradient import backward_sweep
+
+
+def jacobian(
+    outputs: Sequence[ExpressionBase] | Tape,
+    wrt: Sequence[Variable],
+    values: Dict[Variable, float | np.ndarray],
+    mode: str = "auto",
+) -> np.ndarray:
+    """
+    Returns the Jacobian of several expressions with respect to several variables. The
+    expressions are compiled into a single tape and evaluated once, after which the Jacobian is
+    accumulated either forward (one sweep that carries a tangent for every variable along a
+    leading axis) or in reverse (one backward sweep per expression). By default, forward
+    accumulation is used when there are no more variables than expressions, as it then needs
+    the least work.
+
+    Values may be arrays, in which case every entry of the Jacobian is computed element-wise
+    (as in `gradient.grad`), so a whole batch of Jacobians is computed by one evaluation.
+
+    Parameters
+    ----------
+    outputs: Sequence[ExpressionBase] | Tape
+        The expressions to differentiate, or a tape built from them by `compile_all`
+    wrt: Sequence[Variable]
+        The variables to differentiate with respect to
+    values: Dict[Variable, float | np.ndarray]
+        A dictionary of variables and their values at the point where the Jacobian should be
+        evaluated
+    mode: str
+        One of `"auto"`, `"forward"` or `"reverse"`
+
+    Returns
+    -------
+    np.ndarray
+        An array of shape `(M, N, *batch)`, where `M` is the number of expressions, `N` is the
+        number of variables and `batch` is the broadcast shape of the values of the expressions
+        and variables, whose entry `[i, j]` is the derivative of expression `i` with respect
+        to variable `j`
+    """
+    if mode not in ("auto", "forward", "reverse"):
+        raise ValueError(f"Unknown mode {mode!r}, expected 'auto', 'forward' or 'reverse'")
+
+    tape = outputs if isinstance(outputs, Tape) else compile_all(outputs)
+    slots = tape.forward(values)
+    rows, columns = len(tape.outputs), len(wrt)
+
+    batch = np.broadcast_shapes(
+        *(np.shape(slots[output]) for output in tape.outputs),
+        *(np.shape(values[var]) for var in wrt if var in values),
+    )
+    result = np.zeros(
+        (rows, columns, *batch),
+        dtype=np.result_type(float, *(slots[output] for output in tape.outputs)),
+    )
+    var_slots = {var: slot for var, slot in tape.variables}
+
+    if mode == "forward" or (mode == "auto" and columns <= rows):
+        # Variable j is seeded with the j-th unit vector along the leading axis, so the tangent
+        # of every expression holds one row of the Jacobian per variable
+        directions = np.eye(columns).reshape((columns, columns) + (1,) * len(batch))
+        seeds = {}
+        for j, var in enumerate(wrt):
+            if var in var_slots:
+                slot = var_slots[var]
+                seeds[slot] = seeds.get(slot, 0.0) + directions[:, j]
+
+        tangents = forward_sweep(tape, slots, seeds)
+        for i, output in enumerate(tape.outputs):
+            if tangents[output] is not None:
+                result[i] = tangents[output]
+    else:
+        for i, output in enumerate(tape.outputs):
+            adjoints = backward_sweep(tape, slots, {output: 1.0})
+            for j, var in enumerate(wrt):
+                if var in var_slots:
+                    result[i, j] = adjoints[var_slots[var]]
+
+    return result
+
+
+class SparseJacobian:
+    """
+    A Jacobian stored in coordinate form, holding only the entries that are not structurally
+    zero
+
+    Attributes
+    ----------
+    rows: np.ndarray
+        The row (expression) of every stored entry
+    cols: np.ndarray
+        The column (variable) of every stored entry
+    data: np.ndarray
+        The value of every stored entry, of shape `(nnz, *batch)`
+    shape: Tuple[int, int]
+        The number of expressions and variables
+    """
+
+    def __init__(
+        self, rows: np.ndarray, cols: np.ndarray, data: np.ndarray, shape: Tuple[int, int]
+    ):
+        """
+        Parameters
+        ----------
+        rows: np.ndarray
+            The row of every stored entry
+        cols: np.ndarray
+            The column of every stored entry
+        data: np.ndarray
+            The value of every stored entry
+        shape: Tuple[int, int]
+            The number of expressions and variables
+        """
+        self.rows = rows
+        self.cols = cols
+        self.data = data
+        self.shape = shape
+
+    @property
+    def nnz(self) -> int:
+        """The number of stored entries"""
+        return len(self.rows)
+
+    def to_dense(self) -> np.ndarray:
+        """
+        Returns this Jacobian as a dense array of shape `(M, N, *batch)`, as returned by
+        `jacobian`
+        """
+        dense = np.zeros(self.shape + self.data.shape[1:], dtype=self.data.dtype)
+        dense[self.rows, self.cols] = self.data
+        return dense
+
+    def to_scipy(self):
+        """
+        Returns this Jacobian as a `scipy.sparse.coo_matrix`. This requires scipy, and is only
+        possible for Jacobians that were not evaluated at a batch of values
+
+        Returns
+        -------
+        scipy.sparse.coo_matrix
+            The Jacobian
+        """
+        from scipy.sparse import coo_matrix
+
+        if self.data.ndim != 1:
+            raise ValueError(
+                f"Cannot convert a batch of Jacobians (of shape {self.data.shape[1:]}) to scipy"
+            )
+        return coo_matrix((self.data, (self.rows, self.cols)), shape=self.shape)
+
+
+def sparsity_pattern(
+    outputs: Sequence[ExpressionBase] | Tape, wrt: Sequence[Variable]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the structural sparsity pattern of the Jacobian of several expressions, that is, the
+    variables that each expression depends on through its graph. Dependencies are propagated
+    through the compiled tape as bitmasks, one bit per variable.
+
+    Parameters
+    ----------
+    outputs: Sequence[ExpressionBase] | Tape
+        The expressions, or a tape built from them by `compile_all`
+    wrt: Sequence[Variable]
+        The variables
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray]
+        The rows (expressions) and columns (variables) of the structurally nonzero entries,
+        sorted by row and then by column
+    """
+    tape = outputs if isinstance(outputs, Tape) else compile_all(outputs)
+    return _pattern(tape, wrt)
+
+
+def _pattern(tape: Tape, wrt: Sequence[Variable]) -> Tuple[np.ndarray, np.ndarray]:
+    """Implements `sparsity_pattern` for a compiled tape"""
+    masks = [0] * len(tape.constants)
+    var_slots = {var: slot for var, slot in tape.variables}
+    for j, var in enumerate(wrt):
+        if var in var_slots:
+            masks[var_slots[var]] |= 1 << j
+
+    for _, inputs, output in tape.instructions:
+        mask = 0
+        for slot in inputs:
+            mask |= masks[slot]
+        masks[output] = mask
+
+    rows, cols = [], []
+    for i, output in enumerate(tape.outputs):
+        mask = masks[output]
+        while mask:
+            lowest = mask & -mask
+            rows.append(i)
+            cols.append(lowest.bit_length() - 1)
+            mask ^= lowest
+
+    return np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64)
+
+
+def _greedy_coloring(members: List[List[int]], groups: int) -> List[int]:
+    """
+    Colors items so that no two items that share a group have the same color, visiting items
+    that belong to the most groups first and giving each the lowest color available. This is
+    used to color the columns of a Jacobian (items) that share a row (groups), or vice versa.
+
+    Parameters
+    ----------
+    members: List[List[int]]
+        The groups that each item belongs to
+    groups: int
+        The number of groups
+
+    Returns
+    -------
+    List[int]
+        The color of every item
+    """
+    # The colors already used within every group, as a bitmask
+    used = [0] * groups
+    colors = [0] * len(members)
+    for item in sorted(range(len(members)), key=lambda item: -len(members[item])):
+        taken = 0
+        for group in members[item]:
+            taken |= used[group]
+        color = (~taken & (taken + 1)).bit_length() - 1
+        colors[item] = color
+        for group in members[item]:
+            used[group] |= 1 << color
+
+    return colors
+
+
+def sparse_jacobian(
+    outputs: Sequence[ExpressionBase] | Tape,
+    wrt: Sequence[Variable],
+    values: Dict[Variable, float | np.ndarray],
+    mode: str = "auto",
+) -> SparseJacobian:
+    """
+    Returns the Jacobian of several expressions with respect to several variables, computing
+    only its structurally nonzero entries (see `sparsity_pattern`).
+
+    Columns (variables) that never affect the same expression are colored alike, and a single
+    forward sweep carries one tangent per color rather than one per variable. Likewise, rows
+    (expressions) that never depend on the same variable are colored alike, and one backward
+    sweep is run per color. Either way, every entry can be recovered from the compressed sweeps
+    since no two entries of the same color overlap. By default, the mode needing the fewest
+    colors is used.
+
+    Parameters
+    ----------
+    outputs: Sequence[ExpressionBase] | Tape
+        The expressions to differentiate, or a tape built from them by `compile_all`
+    wrt: Sequence[Variable]
+        The variables to differentiate with respect to
+    values: Dict[Variable, float | np.ndarray]
+        A dictionary of variables and their values at the point where the Jacobian should be
+        evaluated. Array values give element-wise Jacobians, as in `jacobian`
+    mode: str
+        One of `"auto"`, `"forward"` or `"reverse"`
+
+    Returns
+    -------
+    SparseJacobian
+        The nonzero entries of the Jacobian
+    """
+    if mode not in ("auto", "forward", "reverse"):
+        raise ValueError(f"Unknown mode {mode!r}, expected 'auto', 'forward' or 'reverse'")
+
+    tape = outputs if isinstance(outputs, Tape) else compile_all(outputs)
+    shape = (len(tape.outputs), len(wrt))
+    rows, cols = _pattern(tape, wrt)
+    slots = tape.forward(values)
+
+    batch = np.broadcast_shapes(
+        *(np.shape(slots[output]) for output in tape.outputs),
+        *(np.shape(values[var]) for var in wrt if var in values),
+    )
+    data = np.zeros(
+        (len(rows), *batch),
+        dtype=np.result_type(float, *(slots[output] for output in tape.outputs)),
+    )
+    var_slots = {var: slot for var, slot in tape.variables}
+
+    rows_of_column: List[List[int]] = [[] for _ in range(shape[1])]
+    columns_of_row: List[List[int]] = [[] for _ in range(shape[0])]
+    for i, j in zip(rows.tolist(), cols.tolist()):
+        rows_of_column[j].append(i)
+        columns_of_row[i].append(j)
+
+    column_colors = _greedy_coloring(rows_of_column, shape[0])
+    row_colors = _greedy_coloring(columns_of_row, shape[1])
+    forward = mode == "forward" or (
+        mode == "auto" and max(column_colors, default=-1) <= max(row_colors, default=-1)
+    )
+
+    if forward:
+        colors = max(column_colors, default=-1) + 1
+        directions = np.eye(colors).reshape((colors, colors) + (1,) * len(batch))
+        seeds = {}
+        for j, var in enumerate(wrt):
+            if var in var_slots:
+                slot = var_slots[var]
+                seeds[slot] = seeds.get(slot, 0.0) + directions[:, column_colors[j]]
+
+        tangents = forward_sweep(tape, slots, seeds)
+        entry_colors = np.array(column_colors, dtype=np.int64)[cols]
+        for i, output in enumerate(tape.outputs):
+            entries = rows == i
+            if tangents[output] is not None and entries.any():
+                compressed = np.broadcast_to(tangents[output], (colors, *batch))
+                data[entries] = compressed[entry_colors[entries]]
+    else:
+        entry_colors = np.array(row_colors, dtype=np.int64)[rows]
+        for color in range(max(row_colors, default=-1) + 1):
+            seeds = {
+                output: 1.0
+                for i, output in enumerate(tape.outputs)
+                if row_colors[i] == color and columns_of_row[i]
+            }
+            if not seeds:
+                continue
+
+            adjoints = backward_sweep(tape, slots, seeds)
+            for k in np.flatnonzero(entry_colors == color).tolist():
+                data[k] = adjoints[var_slots[wrt[cols[k]]]]
+
+    return SparseJacobian(rows, cols, data, shape)
@@ -1,9 +1,9 @@
 """Adds support for adding expressions"""
 
-from typing import override
+from typing import Iterable, override
 import numpy as np
 
-from main.expression import ExpressionBase, Constant, fmt_as_exp
+from main.expression import ExpressionBase, Constant, fmt_as_exp, intern_node, accumulate, is_close
 
 
 class Sum(ExpressionBase):
@@ -20,6 +20,9 @@ class Sum(ExpressionBase):
         The second addend
     """
 
+    __slots__ = ("a", "b")
+    commutative = True
+
     def __init__(self, a: ExpressionBase, b: ExpressionBase):
         """
         Parameters
@@ -29,29 +32,47 @@ class Sum(ExpressionBase):
         b: ExpressionBase
             The second addend
         """
-        self.a = a
-        self.b = b
+        object.__setattr__(self, "a", a)
+        object.__setattr__(self, "b", b)
+        object.__setattr__(self, "_hash", hash((Sum, *sorted((hash(a), hash(b))))))
 
     @override
-    def compute(self, values):
-        return self.a.compute(values) + self.b.compute(values)
+    def operands(self):
+        return (self.a, self.b)
 
+    @staticmethod
     @override
-    def backward(self, var):
-        return add(self.a.backward(var), self.b.backward(var))
+    def kernel(a, b, out=None):
+        if out is None:
+            return a + b
+        return np.add(a, b, out=out)
 
+    @staticmethod
     @override
-    def __repr__(self) -> str:
-        return f"({self.a} + {self.b})"
+    def adjoint(grad, out, a, b):
+        return (grad, grad)
 
+    @staticmethod
     @override
-    def __eq__(self, other) -> bool:
-        if isinstance(other, Sum):
-            return (other.a == self.a and other.b == self.b) or (
-                other.a == self.b and other.b == self.a
-            )
-        else:
-            return False
+    def tangent(tangents, out, a, b):
+        return tangents[0] + tangents[1]
+
+    @staticmethod
+    @override
+    def taylor(series, a, b):
+        return series[0] + series[1]
+
+    @override
+    def derivative(self, var, da, db):
+        return add(da, db)
+
+    @override
+    def format(self):
+        return "({0} + {1})"
+
+    @override
+    def source(self, a, b):
+        return f"{a} + {b}"
 
 
 def add(a: ExpressionBase, b: ExpressionBase) -> ExpressionBase:
@@ -64,13 +85,102 @@ def add(a: ExpressionBase, b: ExpressionBase) -> ExpressionBase:
     b_is_const = isinstance(b, Constant)
 
     if a_is_const and b_is_const:
-        return Constant(a.value + b.value)
-    elif a_is_const and np.allclose(a.value, 0):
+        return intern_node(Constant, a.value + b.value)
+    elif a_is_const and a.is_zero:
         return b
-    elif b_is_const and np.allclose(b.value, 0):
+    elif b_is_const and b.is_zero:
         return a
     else:
-        return Sum(a, b)
+        return intern_node(Sum, a, b)
+
+
+class NarySum(ExpressionBase):
+    """
+    An extension of `ExpressionBase` that represents the sum of any number of expressions.
+    Two n-ary sums are considered equal if, and only if, they have the same addends (in any
+    order)
+
+    Attributes
+    ----------
+    terms: Tuple[ExpressionBase, ...]
+        The addends
+    """
+
+    __slots__ = ("terms",)
+    commutative = True
+
+    def __init__(self, *terms: ExpressionBase):
+        """
+        Parameters
+        ----------
+        *terms: ExpressionBase
+            The addends
+        """
+        object.__setattr__(self, "terms", terms)
+        object.__setattr__(self, "_hash", hash((NarySum, *sorted(hash(term) for term in terms))))
+
+    @override
+    def operands(self):
+        return self.terms
+
+    @staticmethod
+    @override
+    def kernel(*terms, out=None):
+        return accumulate(np.add, terms, out=out)
+
+    @staticmethod
+    @override
+    def adjoint(grad, out, *terms):
+        return (grad,) * len(terms)
+
+    @staticmethod
+    @override
+    def tangent(tangents, out, *terms):
+        return accumulate(np.add, tangents)
+
+    @staticmethod
+    @override
+    def taylor(series, *terms):
+        return accumulate(np.add, series)
+
+    @override
+    def derivative(self, var, *derivatives):
+        return add_all(derivatives)
+
+    @override
+    def format(self):
+        return "(" + " + ".join(f"{{{i}}}" for i in range(len(self.terms))) + ")"
+
+    @override
+    def source(self, *terms):
+        return " + ".join(terms)
+
+
+def add_all(terms: Iterable[ExpressionBase | float | np.ndarray]) -> ExpressionBase:
+    """
+    Returns an expression representing the sum of all inputted expressions. Nested sums (binary
+    or n-ary) are flattened and constants are folded together, so the result is a single
+    `NarySum` holding every addend rather than a deep tree of `Sum` nodes.
+    """
+    flattened = []
+    constant = 0
+    stack = [fmt_as_exp(term) for term in reversed(list(terms))]
+    while stack:
+        term = stack.pop()
+        if isinstance(term, (Sum, NarySum)):
+            stack.extend(reversed(term.children()))
+        elif isinstance(term, Constant):
+            constant = constant + term.value
+        else:
+            flattened.append(term)
+
+    if not flattened:
+        return intern_node(Constant, constant)
+    if not is_close(constant, 0):
+        flattened.append(intern_node(Constant, constant))
+    if len(flattened) == 1:
+        return flattened[0]
+    return intern_node(NarySum, *flattened)
 
 
 ExpressionBase.__add__ = lambda a, b: add(a, fmt_as_exp(b))
@@ -3,7 +3,7 @@
 from typing import override
 import numpy as np
 
-from main.expression import ExpressionBase, Constant, fmt_as_exp
+from main.expression import ExpressionBase, Constant, fmt_as_exp, intern_node
 from main.operations.subtraction import subtract
 from main.operations.multiplication import multiply
 from main.operations.power import power, Power
@@ -23,34 +23,66 @@ class Quotient(ExpressionBase):
       The divisor
     """
 
+    __slots__ = ("a", "b")
+
     def __init__(self, a: ExpressionBase, b: ExpressionBase):
-        self.a = a
-        self.b = b
+        object.__setattr__(self, "a", a)
+        object.__setattr__(self, "b", b)
+        object.__setattr__(self, "_hash", hash((Quotient, hash(a), hash(b))))
+
+    @override
+    def operands(self):
+        return (self.a, self.b)
+
+    @staticmethod
+    @override
+    def kernel(a, b, out=None):
+        return np.divide(a, b, out=out)
 
+    @staticmethod
     @override
-    def compute(self, values):
-        return np.divide(self.a.compute(values), self.b.compute(values))
+    def adjoint(grad, out, a, b):
+        grad_a = np.divide(grad, b)
+        return (grad_a, -grad_a * out)
+
+    @staticmethod
+    @override
+    def tangent(tangents, out, a, b):
+        return np.divide(tangents[0] - out * tangents[1], b)
+
+    @staticmethod
+    @override
+    def taylor(series, a, b):
+        # Solves quotient * b = a for the coefficients of the quotient, one order at a time
+        numerator, denominator = series
+        quotient = np.zeros(
+            np.broadcast_shapes(numerator.shape, denominator.shape),
+            dtype=np.result_type(numerator, denominator, float),
+        )
+        for k in range(len(quotient)):
+            remainder = numerator[k] - sum(
+                (quotient[i] * denominator[k - i] for i in range(k)), start=0.0
+            )
+            quotient[k] = remainder / denominator[0]
+        return quotient
 
     @override
-    def backward(self, var):
+    def derivative(self, var, da, db):
         return divide(
             subtract(
-                multiply(self.a, self.b.backward(var)),
-                multiply(self.b, self.a.backward(var)),
+                multiply(self.b, da),
+                multiply(self.a, db),
             ),
             power(self.b, 2),
         )
 
     @override
-    def __repr__(self) -> str:
-        return f"({self.a}/{self.b})"
+    def format(self):
+        return "({0}/{1})"
 
     @override
-    def __eq__(self, other) -> bool:
-        if isinstance(other, Quotient):
-            return other.a == self.a and other.b == self.b
-        else:
-            return False
+    def source(self, a, b):
+        return f"np.divide({a}, {b})"
 
 
 def divide(a: ExpressionBase, b: ExpressionBase) -> ExpressionBase:
@@ -62,19 +94,19 @@ def divide(a: ExpressionBase, b: ExpressionBase) -> ExpressionBase:
     b_is_const = isinstance(b, Constant)
 
     if a_is_const and b_is_const:
-        return Constant(np.divide(a.value, b.value))
-    elif a_is_const and np.allclose(a.value, 0):
-        return Constant(0)
-    elif b_is_const and np.allclose(b.value, 1):
+        return intern_node(Constant, np.divide(a.value, b.value))
+    elif a_is_const and a.is_zero:
+        return intern_node(Constant, 0)
+    elif b_is_const and b.is_one:
         return a
     elif a == b:
-        return Constant(1)
+        return intern_node(Constant, 1)
     elif isinstance(a, Power) and a.has_same_base(b):
-        return Power(a.base, a.pow - (b.pow if isinstance(b, Power) else 1))
+        return intern_node(Power, a.base, a.power - (b.power if isinstance(b, Power) else 1))
     elif isinstance(b, Power) and b.has_same_base(a):
-        return Power(b.base, (a.pow if isinstance(a, Power) else 1) - b.pow)
+        return intern_node(Power, b.base, (a.power if isinstance(a, Power) else 1) - b.power)
     else:
-        return Quotient(a, b)
+        return intern_node(Quotient, a, b)
 
 
-ExpressionBase.__div__ = lambda a, b: divide(a, fmt_as_exp(b))
+ExpressionBase.__truediv__ = lambda a, b: divide(a, fmt_as_exp(b))
@@ -3,7 +3,7 @@
 from typing import override
 import numpy as np
 
-from main.expression import ExpressionBase, Constant
+from main.expression import ExpressionBase, Constant, freeze, intern_node, is_close, payload_hash
 from main.operations.multiplication import multiply
 
 
@@ -20,42 +20,76 @@ class Exponent(ExpressionBase):
         The argument of this exponent
     """
 
+    __slots__ = ("base", "power")
+
     def __init__(self, base: float | np.ndarray, power: ExpressionBase):
         """
         Parameters
         ----------
         base: float | np.ndarray
             The base of this exponent. Note that using expressions
-            as bases is not currently supported.
+            as bases is not currently supported. Arrays are copied into read-only arrays
+            (see `freeze`)
         pow: ExpressionBase
             The power of this exponent.
         """
-        self.base = base
-        self.power = power
+        base = freeze(base)
+        object.__setattr__(self, "base", base)
+        object.__setattr__(self, "power", power)
+        object.__setattr__(self, "_hash", hash((Exponent, payload_hash(base), hash(power))))
+
+    @override
+    def operands(self):
+        return (self.base, self.power)
 
+    @staticmethod
     @override
-    def compute(self, values):
-        return np.power(self.base, self.power.compute(values))
+    def kernel(base, power, out=None):
+        return np.power(base, power, out=out)
 
+    @staticmethod
     @override
-    def backward(self, var):
+    def adjoint(grad, out, base, power):
+        return (None, grad * out * np.log(base))
+
+    @staticmethod
+    @override
+    def tangent(tangents, out, base, power):
+        return tangents[1] * out * np.log(base)
+
+    @staticmethod
+    @override
+    def taylor(series, base, power):
+        # Differentiating w = base^u gives w' = ln(base) * u' * w, which is solved for the
+        # coefficients of w one order at a time
+        u = series[1] * np.log(base)
+        result = np.zeros(u.shape, dtype=np.result_type(u, float))
+        result[0] = np.power(base, series[1][0])
+        for k in range(1, len(u)):
+            result[k] = sum(j * u[j] * result[k - j] for j in range(1, k + 1)) / k
+        return result
+
+    @override
+    def derivative(self, var, dpower):
         return multiply(
-            Constant(np.log(self.base)),
-            multiply(exponent(self.base, self.power), self.power.backward(var)),
+            intern_node(Constant, np.log(self.base)),
+            multiply(exponent(self.base, self.power), dpower),
         )
 
     @override
-    def __repr__(self) -> str:
-        if np.allclose(self.base, np.e):
-            return f"e^{self.power}"
+    def format(self):
+        if is_close(self.base, np.e):
+            return "e^{0}"
         else:
-            return f"{self.base}^{self.power}"
+            return f"{self.base}^{{0}}"
+
+    @override
+    def source(self, base, power):
+        return f"np.power({base}, {power})"
 
     @override
-    def __eq__(self, other) -> bool:
-        if isinstance(other, Exponent):
-            return np.allclose(self.base, other.base) and self.power == other.power
-        return False
+    def structurally_equal(self, other):
+        return np.array_equal(other.base, self.base)
 
 
 def exponent(base: float | np.ndarray, power: ExpressionBase):
@@ -70,13 +104,13 @@ def exponent(base: float | np.ndarray, power: ExpressionBase):
         The power of this exponent.
     """
     if isinstance(power, Constant):
-        return Constant(np.power(base, power.value))
-    elif np.allclose(base, 0):
-        return Constant(0)
-    elif np.allclose(base, 1):
-        return Constant(1)
+        return intern_node(Constant, np.power(base, power.value))
+    elif is_close(base, 0):
+        return intern_node(Constant, 0)
+    elif is_close(base, 1):
+        return intern_node(Constant, 1)
     else:
-        return Exponent(base, power)
+        return intern_node(Exponent, base, power)
 
 
 def exp(power: ExpressionBase):
@@ -89,6 +123,6 @@ def exp(power: ExpressionBase):
         The power of this exponent.
     """
     if isinstance(power, Constant):
-        return Constant(np.exp(power.value))
+        return intern_node(Constant, np.exp(power.value))
     else:
-        return Exponent(np.e, power)
+        return intern_node(Exponent, np.e, power)
@@ -3,7 +3,7 @@
 from typing import override
 import numpy as np
 
-from main.expression import ExpressionBase, Constant
+from main.expression import ExpressionBase, Constant, freeze, intern_node, is_close, payload_hash
 from main.operations.multiplication import multiply
 from main.operations.division import divide
 
@@ -20,55 +20,93 @@ class Logarithm(ExpressionBase):
         The argument of this logarithm
     """
 
+    __slots__ = ("base", "argument")
+
     def __init__(self, base: float | np.ndarray, argument: ExpressionBase):
         """
         Parameters
         ----------
         base: float | np.ndarray
             The base of this logarithm. Note that using expressions
-            as bases is not currently supported.
+            as bases is not currently supported. Arrays are copied into read-only arrays
+            (see `freeze`)
         argument: ExpressionBase
             The argument of this logarithm.
         """
-        self.base = base
-        self.argument = argument
+        base = freeze(base)
+        object.__setattr__(self, "base", base)
+        object.__setattr__(self, "argument", argument)
+        object.__setattr__(self, "_hash", hash((Logarithm, payload_hash(base), hash(argument))))
+
+    @override
+    def operands(self):
+        return (self.base, self.argument)
 
+    @staticmethod
     @override
-    def compute(self, values):
-        return np.log(self.argument.compute(values)) / np.log(self.base)
+    def kernel(base, argument, out=None):
+        if out is None:
+            return np.log(argument) / np.log(base)
+        np.log(argument, out=out)
+        return np.divide(out, np.log(base), out=out)
 
+    @staticmethod
     @override
-    def backward(self, var):
+    def adjoint(grad, out, base, argument):
+        return (None, np.divide(grad, argument * np.log(base)))
+
+    @staticmethod
+    @override
+    def tangent(tangents, out, base, argument):
+        return np.divide(tangents[1], argument * np.log(base))
+
+    @staticmethod
+    @override
+    def taylor(series, base, argument):
+        # Differentiating w = ln(u) gives u * w' = u', which is solved for the coefficients of
+        # w one order at a time
+        u = series[1]
+        result = np.zeros(u.shape, dtype=np.result_type(u, float))
+        result[0] = np.log(u[0])
+        for k in range(1, len(u)):
+            total = sum((j * result[j] * u[k - j] for j in range(1, k)), start=0.0)
+            result[k] = (u[k] - total / k) / u[0]
+        return result / np.log(base)
+
+    @override
+    def derivative(self, var, dargument):
         return divide(
-            multiply(self.argument.backward(var), Constant(np.log(self.base))),
-            self.argument,
+            dargument,
+            multiply(self.argument, intern_node(Constant, np.log(self.base))),
         )
 
     @override
-    def __repr__(self) -> str:
-        if np.allclose(self.base, np.e):
-            return f"ln{self.argument}"
+    def format(self):
+        if is_close(self.base, np.e):
+            return "ln{0}"
         else:
-            return f"log_({self.base}){self.argument}"
+            return f"log_({self.base}){{0}}"
+
+    @override
+    def source(self, base, argument):
+        return f"np.log({argument}) / np.log({base})"
 
     @override
-    def __eq__(self, other) -> bool:
-        if isinstance(other, Logarithm):
-            return np.allclose(self.base, other.base) and self.argument == other.argument
-        return False
+    def structurally_equal(self, other):
+        return np.array_equal(other.base, self.base)
 
 
 def ln(arg: ExpressionBase):
     """Returns the natural logarithm of an expression"""
     if isinstance(arg, Constant):
-        return Constant(np.log(arg.value))
+        return intern_node(Constant, np.log(arg.value))
     else:
-        return Logarithm(np.e, arg)
+        return intern_node(Logarithm, np.e, arg)
 
 
 def log(base: float | np.ndarray, arg: ExpressionBase):
     """Returns the logarithm of an expression with the given base"""
     if isinstance(arg, Constant):
-        return Constant(np.log(arg.value) / np.log(base))
+        return intern_node(Constant, np.log(arg.value) / np.log(base))
     else:
-        return Logarithm(base, arg)
+        return intern_node(Logarithm, base, arg)
@@ -1,11 +1,19 @@
 """Adds support for multiplying two expressions together"""
 
-from typing import override
+from typing import Iterable, List, override
 
 import numpy as np
 
-from main.expression import ExpressionBase, Constant, fmt_as_exp
-from main.operations.addition import add
+from main.expression import (
+    ExpressionBase,
+    Constant,
+    fmt_as_exp,
+    intern_node,
+    accumulate,
+    is_close,
+    series_product,
+)
+from main.operations.addition import add, add_all
 
 # Importing exponentiation will supply these values
 POWER_FUNC = None
@@ -37,6 +45,9 @@ class Product(ExpressionBase):
         The second factor
     """
 
+    __slots__ = ("a", "b")
+    commutative = True
+
     def __init__(self, a: ExpressionBase, b: ExpressionBase):
         """
         Parameters
@@ -46,32 +57,50 @@ class Product(ExpressionBase):
         b: ExpressionBase
             The second factor
         """
-        self.a = a
-        self.b = b
+        object.__setattr__(self, "a", a)
+        object.__setattr__(self, "b", b)
+        object.__setattr__(self, "_hash", hash((Product, *sorted((hash(a), hash(b))))))
+
+    @override
+    def operands(self):
+        return (self.a, self.b)
+
+    @staticmethod
+    @override
+    def kernel(a, b, out=None):
+        if out is None:
+            return a * b
+        return np.multiply(a, b, out=out)
+
+    @staticmethod
+    @override
+    def adjoint(grad, out, a, b):
+        return (grad * b, grad * a)
 
+    @staticmethod
     @override
-    def compute(self, values):
-        return self.a.compute(values) * self.b.compute(values)
+    def tangent(tangents, out, a, b):
+        return tangents[0] * b + a * tangents[1]
 
+    @staticmethod
     @override
-    def backward(self, var):
+    def taylor(series, a, b):
+        return series_product(series[0], series[1])
+
+    @override
+    def derivative(self, var, da, db):
         return add(
-            multiply(self.a.backward(var), self.b),
-            multiply(self.b.backward(var), self.a),
+            multiply(da, self.b),
+            multiply(db, self.a),
         )
 
     @override
-    def __repr__(self) -> str:
-        return f"({self.a} * {self.b})"
+    def format(self):
+        return "({0} * {1})"
 
     @override
-    def __eq__(self, other) -> bool:
-        if isinstance(other, Product):
-            return (other.a == self.a and other.b == self.b) or (
-                other.a == self.b and other.b == self.a
-            )
-        else:
-            return False
+    def source(self, a, b):
+        return f"{a} * {b}"
 
 
 def multiply(a: ExpressionBase, b: ExpressionBase) -> ExpressionBase:
@@ -83,14 +112,12 @@ def multiply(a: ExpressionBase, b: ExpressionBase) -> ExpressionBase:
     b_is_const = isinstance(b, Constant)
 
     if a_is_const and b_is_const:
-        return Constant(a.value * b.value)
-    elif (a_is_const and np.allclose(a.value, 0)) or (
-        b_is_const and np.allclose(b.value, 0)
-    ):
-        return Constant(0)
-    elif a_is_const and np.allclose(a.value, 1):
+        return intern_node(Constant, a.value * b.value)
+    elif (a_is_const and a.is_zero) or (b_is_const and b.is_zero):
+        return intern_node(Constant, 0)
+    elif a_is_const and a.is_one:
         return b
-    elif b_is_const and np.allclose(b.value, 1):
+    elif b_is_const and b.is_one:
         return a
 
     if POWER_FUNC is not None:
@@ -100,12 +127,130 @@ def multiply(a: ExpressionBase, b: ExpressionBase) -> ExpressionBase:
         if (a_is_power and a.has_same_base(b)) or (b_is_power and b.has_same_base(a)):
             return POWER_FUNC(
                 a.base if a_is_power else b.base,
-                (a.pow if a_is_power else 1) + (b.pow if b_is_power else 1),
+                (a.power if a_is_power else 1) + (b.power if b_is_power else 1),
             )
         elif (not a_is_power) and (not b_is_power) and a == b:
             return POWER_FUNC(a, 2)
 
-    return Product(a, b)
+    return intern_node(Product, a, b)
+
+
+class NaryProduct(ExpressionBase):
+    """
+    An extension of `ExpressionBase` that represents the product of any number of expressions.
+    Two n-ary products are considered equal if, and only if, they have the same factors (in any
+    order)
+
+    Attributes
+    ----------
+    factors: Tuple[ExpressionBase, ...]
+        The factors
+    """
+
+    __slots__ = ("factors",)
+    commutative = True
+
+    def __init__(self, *factors: ExpressionBase):
+        """
+        Parameters
+        ----------
+        *factors: ExpressionBase
+            The factors
+        """
+        object.__setattr__(self, "factors", factors)
+        object.__setattr__(
+            self, "_hash", hash((NaryProduct, *sorted(hash(factor) for factor in factors)))
+        )
+
+    @override
+    def operands(self):
+        return self.factors
+
+    @staticmethod
+    @override
+    def kernel(*factors, out=None):
+        return accumulate(np.multiply, factors, out=out)
+
+    @staticmethod
+    @override
+    def adjoint(grad, out, *factors):
+        return tuple(grad * others for others in _products_of_others(factors))
+
+    @staticmethod
+    @override
+    def tangent(tangents, out, *factors):
+        return accumulate(
+            np.add, [t * others for t, others in zip(tangents, _products_of_others(factors))]
+        )
+
+    @staticmethod
+    @override
+    def taylor(series, *factors):
+        result = series[0]
+        for factor in series[1:]:
+            result = series_product(result, factor)
+        return result
+
+    @override
+    def derivative(self, var, *derivatives):
+        return add_all(
+            multiply_all(self.factors[:i] + (derivative,) + self.factors[i + 1 :])
+            for i, derivative in enumerate(derivatives)
+            if not (isinstance(derivative, Constant) and derivative.is_zero)
+        )
+
+    @override
+    def format(self):
+        return "(" + " * ".join(f"{{{i}}}" for i in range(len(self.factors))) + ")"
+
+    @override
+    def source(self, *factors):
+        return " * ".join(factors)
+
+
+def _products_of_others(factors) -> List:
+    """
+    Returns, for every factor, the product of all other factors. Uses prefix and suffix
+    products, so no division is needed and zero factors are handled correctly
+    """
+    prefixes = [1.0]
+    for factor in factors[:-1]:
+        prefixes.append(prefixes[-1] * factor)
+
+    products = [None] * len(factors)
+    suffix = 1.0
+    for i in reversed(range(len(factors))):
+        products[i] = prefixes[i] * suffix
+        suffix = suffix * factors[i]
+
+    return products
+
+
+def multiply_all(factors: Iterable[ExpressionBase | float | np.ndarray]) -> ExpressionBase:
+    """
+    Returns an expression representing the product of all inputted expressions. Nested
+    products (binary or n-ary) are flattened and constants are folded together, so the result is
+    a single `NaryProduct` holding every factor rather than a deep tree of `Product` nodes.
+    """
+    flattened = []
+    constant = 1
+    stack = [fmt_as_exp(factor) for factor in reversed(list(factors))]
+    while stack:
+        factor = stack.pop()
+        if isinstance(factor, (Product, NaryProduct)):
+            stack.extend(reversed(factor.children()))
+        elif isinstance(factor, Constant):
+            constant = constant * factor.value
+        else:
+            flattened.append(factor)
+
+    if not flattened or is_close(constant, 0):
+        return intern_node(Constant, 0 if flattened else constant)
+    if not is_close(constant, 1):
+        flattened.append(intern_node(Constant, constant))
+    if len(flattened) == 1:
+        return flattened[0]
+    return intern_node(NaryProduct, *flattened)
 
 
 ExpressionBase.__mul__ = lambda a, b: multiply(a, fmt_as_exp(b))
@@ -113,4 +258,4 @@ ExpressionBase.__mul__ = lambda a, b: multiply(a, fmt_as_exp(b))
 
 # Specify wildcard import to not include the power function/power class setters, as those are
 # meant to only be used internally
-__all__ = ["Product", "multiply"]
+__all__ = ["Product", "multiply", "NaryProduct", "multiply_all"]
@@ -3,7 +3,16 @@
 from typing import override
 import numpy as np
 
-from main.expression import ExpressionBase, Variable, Constant
+from main.expression import (
+    ExpressionBase,
+    Variable,
+    Constant,
+    freeze,
+    intern_node,
+    payload_hash,
+    is_close,
+    series_product,
+)
 from main.operations.multiplication import multiply, set_power_func, set_power_class
 
 
@@ -19,6 +28,8 @@ class Power(ExpressionBase):
         The power that `base` should be raised to
     """
 
+    __slots__ = ("base", "power")
+
     def __init__(self, base: ExpressionBase, _power: float | np.ndarray):
         """
         Parameters
@@ -27,21 +38,68 @@ class Power(ExpressionBase):
             The base of this exponent
         pow: float | np.ndarray
             The power that `base` should be raised to. Note that expressions
-            as powers are not currently supported.
+            as powers are not currently supported. Arrays are copied into read-only arrays
+            (see `freeze`)
         """
-        self.base = base
-        self.power = _power
+        _power = freeze(_power)
+        object.__setattr__(self, "base", base)
+        object.__setattr__(self, "power", _power)
+        object.__setattr__(self, "_hash", hash((Power, hash(base), payload_hash(_power))))
+
+    @override
+    def operands(self):
+        return (self.base, self.power)
+
+    @staticmethod
+    @override
+    def kernel(base, _power, out=None):
+        return np.power(base, _power, out=out)
+
+    @staticmethod
+    @override
+    def adjoint(grad, out, base, _power):
+        return (grad * _power * np.power(base, _power - 1), None)
 
+    @staticmethod
     @override
-    def compute(self, values):
-        return np.power(self.base.compute(values), self.power)
+    def tangent(tangents, out, base, _power):
+        return tangents[0] * _power * np.power(base, _power - 1)
 
+    @staticmethod
     @override
-    def backward(self, var: Variable):
+    def taylor(series, base, _power):
+        u = series[0]
+        if np.ndim(_power) == 0 and _power >= 0 and _power == int(_power):
+            # Whole powers are expanded by repeated squaring, which (unlike the recurrence
+            # below) does not divide by the value of the base
+            result = np.zeros_like(u, dtype=np.result_type(u, float))
+            result[0] = 1
+            square, exponent = u, int(_power)
+            while exponent:
+                if exponent & 1:
+                    result = series_product(result, square)
+                exponent >>= 1
+                if exponent:
+                    square = series_product(square, square)
+            return result
+
+        # Differentiating w = u^p gives u * w' = p * u' * w, which is solved for the
+        # coefficients of w one order at a time. An array exponent broadcasts against the
+        # coefficients of the base
+        shape = (len(u),) + np.broadcast_shapes(u.shape[1:], np.shape(_power))
+        result = np.zeros(shape, dtype=np.result_type(u, _power, float))
+        result[0] = np.power(u[0], _power)
+        for k in range(1, len(u)):
+            total = sum(((_power + 1) * j - k) * u[j] * result[k - j] for j in range(1, k + 1))
+            result[k] = total / (k * u[0])
+        return result
+
+    @override
+    def derivative(self, var: Variable, dbase):
         return multiply(
             multiply(
-                Constant(self.power),
-                self.base.backward(var),
+                intern_node(Constant, self.power),
+                dbase,
             ),
             power(self.base, self.power - 1),
         )
@@ -57,13 +115,16 @@ class Power(ExpressionBase):
             return self.base == other
 
     @override
-    def __repr__(self) -> str:
-        return f"({self.base}^({self.power}))"
+    def format(self):
+        return f"({{0}}^({self.power}))"
 
     @override
-    def __eq__(self, other) -> bool:
-        if isinstance(other, Power):
-            return other.base == self.base and other.power == self.power
+    def source(self, base, _power):
+        return f"np.power({base}, {_power})"
+
+    @override
+    def structurally_equal(self, other):
+        return np.array_equal(other.power, self.power)
 
 
 def power(base: ExpressionBase, _power: float | np.ndarray) -> ExpressionBase:
@@ -71,17 +132,17 @@ def power(base: ExpressionBase, _power: float | np.ndarray) -> ExpressionBase:
     Returns an expression representing the inputted expression raised to the given power.
     This function will automatically simplify certain powers
     """
-    if np.allclose(_power, 1):
+    if is_close(_power, 1):
         return base
-    elif np.allclose(_power, 0):
-        return Constant(1)
+    elif is_close(_power, 0):
+        return intern_node(Constant, 1)
 
     if isinstance(base, Constant):
-        return Constant(np.power(base.value, _power))
+        return intern_node(Constant, np.power(base.value, _power))
     elif isinstance(base, Power):
-        return Power(base.base, base.power * _power)
+        return intern_node(Power, base.base, base.power * _power)
 
-    return Power(base, _power)
+    return intern_node(Power, base, _power)
 
 
 ExpressionBase.__pow__ = power
@@ -89,5 +150,3 @@ ExpressionBase.__pow__ = power
 # Supply multiplication with power functions
 set_power_func(power)
 set_power_class(Power)
-
-print("done")
@@ -3,7 +3,8 @@
 from typing import override
 import numpy as np
 
-from main.expression import ExpressionBase, Constant, fmt_as_exp
+from main.expression import ExpressionBase, Constant, fmt_as_exp, intern_node
+from main.operations.multiplication import multiply
 
 
 class Difference(ExpressionBase):
@@ -19,6 +20,8 @@ class Difference(ExpressionBase):
         The subtrahend
     """
 
+    __slots__ = ("a", "b")
+
     def __init__(self, a: ExpressionBase, b: ExpressionBase):
         """
         This class represents a - b
@@ -30,27 +33,47 @@ class Difference(ExpressionBase):
         b: ExpressionBase
             The subtrahend
         """
-        self.a = a
-        self.b = b
+        object.__setattr__(self, "a", a)
+        object.__setattr__(self, "b", b)
+        object.__setattr__(self, "_hash", hash((Difference, hash(a), hash(b))))
+
+    @override
+    def operands(self):
+        return (self.a, self.b)
+
+    @staticmethod
+    @override
+    def kernel(a, b, out=None):
+        if out is None:
+            return a - b
+        return np.subtract(a, b, out=out)
+
+    @staticmethod
+    @override
+    def adjoint(grad, out, a, b):
+        return (grad, -grad)
+
+    @staticmethod
+    @override
+    def tangent(tangents, out, a, b):
+        return tangents[0] - tangents[1]
 
+    @staticmethod
     @override
-    def compute(self, values):
-        return self.a.compute(values) - self.b.compute(values)
+    def taylor(series, a, b):
+        return series[0] - series[1]
 
     @override
-    def backward(self, var):
-        return subtract(self.a.backward(var), self.b.backward(var))
+    def derivative(self, var, da, db):
+        return subtract(da, db)
 
     @override
-    def __repr__(self) -> str:
-        return f"({self.a} + {self.b})"
+    def format(self):
+        return "({0} - {1})"
 
     @override
-    def __eq__(self, other) -> bool:
-        if isinstance(other, Difference):
-            return other.a == self.a and other.b == self.b
-        else:
-            return False
+    def source(self, a, b):
+        return f"{a} - {b}"
 
 
 def subtract(a: ExpressionBase, b: ExpressionBase) -> ExpressionBase:
@@ -62,13 +85,13 @@ def subtract(a: ExpressionBase, b: ExpressionBase) -> ExpressionBase:
     b_is_const = isinstance(b, Constant)
 
     if a_is_const and b_is_const:
-        return Constant(a.value - b.value)
-    elif a_is_const and np.allclose(a.value, 0):
-        return b
-    elif b_is_const and np.allclose(b.value, 0):
+        return intern_node(Constant, a.value - b.value)
+    elif a_is_const and a.is_zero:
+        return multiply(intern_node(Constant, -1), b)
+    elif b_is_const and b.is_zero:
         return a
     else:
-        return Difference(a, b)
+        return intern_node(Difference, a, b)
 
 
 ExpressionBase.__sub__ = lambda a, b: subtract(a, fmt_as_exp(b))
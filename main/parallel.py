@@ -0,0 +1,295 @@
+"""
+Evaluates expressions on several cores at once, either by splitting large inputs along their
+leading axis and evaluating each part in a separate worker process, or by evaluating independent
+nodes concurrently in a pool of threads
+"""
+
+from __future__ import annotations
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, List, Tuple
+import os
+import weakref
+import numpy as np
+
+from main.expression import ExpressionBase, Variable
+from main.compiler import NODE_TYPES, Tape, compile
+
+# The tape evaluated by a worker process, sent once when the worker starts
+_WORKER_TAPE: Tape | None = None
+
+# The name of the shared memory block behind every live array returned by `shared_array`, keyed
+# by the identity of the array
+_SHARED_NAMES: Dict[int, str] = {}
+
+# The number of elements that `threaded_compute` must compute in total (summed over every node)
+# before it is worth dispatching nodes to threads
+THREAD_THRESHOLD = 1 << 20
+
+
+def _share(shape: Tuple[int, ...], dtype: np.dtype) -> Tuple[SharedMemory, np.ndarray]:
+    """
+    Allocates a block of shared memory holding an array of the given shape and type
+
+    Parameters
+    ----------
+    shape: Tuple[int, ...]
+        The shape of the shared array
+    dtype: np.dtype
+        The type of the shared array
+
+    Returns
+    -------
+    Tuple[SharedMemory, np.ndarray]
+        The block of shared memory along with an array that views it
+    """
+    dtype = np.dtype(dtype)
+    memory = SharedMemory(create=True, size=max(int(np.prod(shape)) * dtype.itemsize, 1))
+    return memory, np.ndarray(shape, dtype, buffer=memory.buf)
+
+
+def _release(memory: SharedMemory, key: int):
+    """Frees the block of shared memory behind an array returned by `shared_array`"""
+    _SHARED_NAMES.pop(key, None)
+    memory.close()
+    memory.unlink()
+
+
+def shared_array(shape: Tuple[int, ...], dtype: np.dtype = float) -> np.ndarray:
+    """
+    Returns an uninitialized array placed in a block of shared memory. The block is freed once
+    the array (and every view of it) has been garbage collected. `parallel_compute` reads such
+    arrays in place, while any other input has to be copied into shared memory first.
+
+    Parameters
+    ----------
+    shape: Tuple[int, ...]
+        The shape of the array
+    dtype: np.dtype
+        The type of the array
+
+    Returns
+    -------
+    np.ndarray
+        The shared array
+    """
+    memory, array = _share(tuple(shape), dtype)
+    _SHARED_NAMES[id(array)] = memory.name
+    weakref.finalize(array, _release, memory, id(array))
+    return array
+
+
+def _attach(name: str) -> SharedMemory:
+    """
+    Attaches to a block of shared memory created by the parent process. The parent owns the
+    block, so the worker must not register it with a resource tracker that might unlink it
+    """
+    try:
+        return SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 always registers attached blocks, which is harmless as long as worker
+        # processes share the parent's resource tracker (as they do when forked)
+        return SharedMemory(name=name)
+
+
+def _init_worker(tape: Tape):
+    """Stores the tape that a worker process evaluates"""
+    global _WORKER_TAPE
+    _WORKER_TAPE = tape
+
+
+def _compute_part(
+    inputs: List[Tuple[str, Tuple[int, ...], str, bool] | float],
+    output: Tuple[str, Tuple[int, ...], str],
+    start: int,
+    stop: int,
+):
+    """
+    Evaluates the worker's tape on rows `start` to `stop` of the inputs, writing the result into
+    the same rows of the output. Arrays are described by the name of their shared memory block,
+    their shape and their type (and, for inputs, whether they are split along the leading axis)
+    """
+    blocks = []
+
+    def view(name, shape, dtype):
+        blocks.append(_attach(name))
+        return np.ndarray(shape, dtype, buffer=blocks[-1].buf)
+
+    values = {}
+    for (var, _), spec in zip(_WORKER_TAPE.variables, inputs):
+        if isinstance(spec, tuple):
+            name, shape, dtype, split = spec
+            array = view(name, shape, dtype)
+            values[var] = array[start:stop] if split else array
+        else:
+            values[var] = spec
+
+    try:
+        _WORKER_TAPE.compute_buffered(values, out=view(*output)[start:stop])
+    finally:
+        # Views must be released before the blocks can be closed
+        values = array = None
+        for block in blocks:
+            block.close()
+
+
+def parallel_compute(
+    expression: ExpressionBase | Tape,
+    values: Dict[Variable, float | np.ndarray],
+    workers: int | None = None,
+) -> float | np.ndarray:
+    """
+    Evaluates an expression using a pool of worker processes. The rows (entries along the
+    leading axis) of the result are divided evenly between the workers, and every input array
+    that spans the leading axis of the result is split accordingly. Inputs and the result live
+    in shared memory, so workers read their rows and write their part of the result in place,
+    and the expression is sent to each worker only once.
+
+    Inputs created with `shared_array` are read in place. Any other input array is copied
+    into shared memory once per call, so large inputs that are evaluated repeatedly should be
+    placed in shared arrays. The result is itself a shared array, written by the workers and
+    returned without being copied.
+
+    Parameters
+    ----------
+    expression: ExpressionBase | Tape
+        The expression to evaluate
+    values: Dict[Variable, float | np.ndarray]
+        A dictionary of variables and their values
+    workers: int, optional
+        The number of worker processes. Defaults to the number of cores
+
+    Returns
+    -------
+    float | np.ndarray
+        The evaluated point
+    """
+    tape = expression if isinstance(expression, Tape) else compile(expression)
+    workers = workers or os.cpu_count() or 1
+
+    plan = tape.plan(values)
+    if plan.dtype is None or workers == 1 or plan.shape[0] < 2:
+        return tape.compute_buffered(values)
+    rows = plan.shape[0]
+
+    # Blocks created for copies of the inputs, which are freed once the workers are done
+    blocks = []
+    try:
+        inputs = []
+        for var, _ in tape.variables:
+            value = values[var]
+            if not isinstance(value, np.ndarray) or value.ndim == 0:
+                inputs.append(value)
+                continue
+
+            name = _SHARED_NAMES.get(id(value))
+            if name is None:
+                memory, shared = _share(value.shape, value.dtype)
+                blocks.append(memory)
+                shared[...] = value
+                name = memory.name
+            split = value.ndim == len(plan.shape) and value.shape[0] == rows
+            inputs.append((name, value.shape, value.dtype.str, split))
+
+        result = shared_array(plan.shape, plan.dtype)
+        output = (_SHARED_NAMES[id(result)], plan.shape, plan.dtype.str)
+
+        bounds = np.linspace(0, rows, min(workers, rows) + 1).astype(int)
+        with ProcessPoolExecutor(
+            len(bounds) - 1, initializer=_init_worker, initargs=(tape,)
+        ) as executor:
+            parts = [
+                executor.submit(_compute_part, inputs, output, start, stop)
+                for start, stop in zip(bounds[:-1], bounds[1:])
+            ]
+            for part in parts:
+                part.result()
+
+        return result
+    finally:
+        shared = None
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
+def threaded_compute(
+    expression: ExpressionBase | Tape,
+    values: Dict[Variable, float | np.ndarray],
+    workers: int | None = None,
+    threshold: int = THREAD_THRESHOLD,
+) -> float | np.ndarray:
+    """
+    Evaluates an expression using a pool of threads. Every node is dispatched as soon as all of
+    its operands have been computed, so independent subexpressions (such as the terms of a sum)
+    are evaluated concurrently. Numpy releases the GIL inside its kernels, so this speeds up
+    wide expressions over large arrays. Values are dropped as soon as every node that reads them
+    has run.
+
+    Parameters
+    ----------
+    expression: ExpressionBase | Tape
+        The expression to evaluate
+    values: Dict[Variable, float | np.ndarray]
+        A dictionary of variables and their values
+    workers: int, optional
+        The number of threads. Defaults to the number of cores
+    threshold: int
+        The number of elements computed by the whole expression (summed over every node) below
+        which the expression is evaluated serially, as dispatching nodes to threads would cost
+        more than it saves
+
+    Returns
+    -------
+    float | np.ndarray
+        The evaluated point
+    """
+    tape = expression if isinstance(expression, Tape) else compile(expression)
+    workers = workers or os.cpu_count() or 1
+
+    plan = tape.plan(values)
+    cost = sum(int(np.prod(plan.shapes[output])) for _, _, output in tape.instructions)
+    if workers == 1 or cost < threshold:
+        return plan.compute(values)
+
+    slots = list(tape.constants)
+    for var, slot in tape.variables:
+        slots[slot] = values[var]
+
+    producers = {output: i for i, (_, _, output) in enumerate(tape.instructions)}
+    consumers: Dict[int, List[int]] = {}
+    pending = []
+    for i, (_, inputs, _) in enumerate(tape.instructions):
+        dependencies = {slot for slot in inputs if slot in producers}
+        for slot in dependencies:
+            consumers.setdefault(slot, []).append(i)
+        pending.append(len(dependencies))
+    uses = {slot: len(readers) for slot, readers in consumers.items()}
+
+    kernels = [cls.kernel for cls in NODE_TYPES]
+
+    def run(i):
+        opcode, inputs, _ = tape.instructions[i]
+        return kernels[opcode](*[slots[slot] for slot in inputs])
+
+    with ThreadPoolExecutor(workers) as executor:
+        running = {executor.submit(run, i): i for i, count in enumerate(pending) if count == 0}
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                i = running.pop(future)
+                _, inputs, output = tape.instructions[i]
+                slots[output] = future.result()
+
+                for slot in set(inputs):
+                    if slot in uses:
+                        uses[slot] -= 1
+                        if uses[slot] == 0 and slot != tape.output:
+                            slots[slot] = None
+
+                for reader in consumers.get(output, ()):
+                    pending[reader] -= 1
+                    if pending[reader] == 0:
+                        running[executor.submit(run, reader)] = reader
+
+    return slots[tape.output]
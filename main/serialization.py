@@ -0,0 +1,171 @@
+"""
+Serializes expression graphs into a compact binary format made of flat numpy arrays, so they can
+be cached on disk or sent to other processes regardless of their depth
+"""
+
+from __future__ import annotations
+from io import BytesIO
+from typing import Dict, List, Mapping, Sequence, Tuple
+import numpy as np
+
+from main.expression import ExpressionBase, Variable
+from main.graph_store import GraphStore
+
+# The version of the format written by `dumps`
+FORMAT_VERSION = 1
+
+# The Python scalar types that the constant pool stores in their own arrays (along with the type
+# of the array), indexed by their kind. Any other constant is stored as a numpy array of its own
+_SCALAR_KINDS: List[Tuple[type, type]] = [
+    (int, np.int64),
+    (float, np.float64),
+    (complex, np.complex128),
+]
+
+# The kinds of constants that are stored as numpy arrays, or as numpy scalars (0-d arrays)
+_ARRAY_KIND = len(_SCALAR_KINDS)
+_NUMPY_SCALAR_KIND = _ARRAY_KIND + 1
+
+
+def _encode(expression: ExpressionBase) -> Tuple[Dict[str, np.ndarray], List[Variable]]:
+    """
+    Converts an expression into the arrays written by `dumps`, along with its variables in the
+    order of the symbol table
+    """
+    store = GraphStore.from_expression(expression)
+
+    kinds = []
+    positions = []
+    scalars: List[list] = [[] for _ in _SCALAR_KINDS]
+    arrays = {}
+    for value in store.constants:
+        kind = next((k for k, (cls, _) in enumerate(_SCALAR_KINDS) if type(value) is cls), None)
+        if kind is not None:
+            positions.append(len(scalars[kind]))
+            scalars[kind].append(value)
+        else:
+            kind = _ARRAY_KIND if isinstance(value, np.ndarray) else _NUMPY_SCALAR_KIND
+            positions.append(len(arrays))
+            arrays[f"array_{len(arrays)}"] = np.asarray(value)
+        kinds.append(kind)
+
+    encoded = {
+        "version": np.array(FORMAT_VERSION),
+        "opcodes": store.opcodes,
+        "offsets": store.offsets,
+        "operands": store.operands,
+        "symbols": np.array([var.name for var in store.variables], dtype=str),
+        "kinds": np.array(kinds, dtype=np.uint8),
+        "positions": np.array(positions, dtype=np.int64),
+        **{
+            f"scalars_{k}": np.array(values, dtype=dtype)
+            for k, ((_, dtype), values) in enumerate(zip(_SCALAR_KINDS, scalars))
+        },
+        **arrays,
+    }
+    return encoded, store.variables
+
+
+def dumps(expression: ExpressionBase) -> bytes:
+    """
+    Serializes an expression. The arrays of its `GraphStore` are written as is, so every unique
+    node is stored once and shared subexpressions stay shared, while the constant pool is
+    stored in typed numpy arrays. Variables are stored by name
+    in a symbol table, in the order returned by `symbols`.
+
+    Parameters
+    ----------
+    expression: ExpressionBase
+        The expression to serialize
+
+    Returns
+    -------
+    bytes
+        The serialized expression, readable by `loads`
+    """
+    encoded, _ = _encode(expression)
+    return _pack(encoded)
+
+
+def _pack(encoded: Dict[str, np.ndarray]) -> bytes:
+    """Writes the arrays of an encoded expression into a single buffer"""
+    buffer = BytesIO()
+    np.savez(buffer, **encoded)
+    return buffer.getvalue()
+
+
+def symbols(data: bytes) -> List[str]:
+    """
+    Returns the names of the variables of a serialized expression, in the order in which
+    `loads` expects them
+
+    Parameters
+    ----------
+    data: bytes
+        An expression serialized by `dumps`
+
+    Returns
+    -------
+    List[str]
+        The name of every variable
+    """
+    with np.load(BytesIO(data), allow_pickle=False) as encoded:
+        return encoded["symbols"].tolist()
+
+
+def loads(
+    data: bytes, variables: Sequence[Variable] | Mapping[str, Variable] | None = None
+) -> ExpressionBase:
+    """
+    Deserializes an expression serialized by `dumps`. Nodes are rebuilt with `intern_node` (see
+    `GraphStore.node`), so they are shared with equal nodes that already exist in this process.
+
+    Parameters
+    ----------
+    data: bytes
+        The serialized expression
+    variables: Sequence[Variable] | Mapping[str, Variable], optional
+        The variables to use in the expression, either in the order returned by `symbols` or
+        keyed by name. Variables that are not given are created anew
+
+    Returns
+    -------
+    ExpressionBase
+        The deserialized expression
+    """
+    with np.load(BytesIO(data), allow_pickle=False) as encoded:
+        if int(encoded["version"]) != FORMAT_VERSION:
+            raise ValueError(f"Unsupported serialization format version {int(encoded['version'])}")
+
+        names = encoded["symbols"].tolist()
+        if variables is None:
+            variables = [Variable(name) for name in names]
+        elif isinstance(variables, Mapping):
+            variables = [variables.get(name) or Variable(name) for name in names]
+        elif len(variables) != len(names):
+            raise ValueError(f"Expected {len(names)} variables, got {len(variables)}")
+
+        scalars = [encoded[f"scalars_{k}"].tolist() for k in range(len(_SCALAR_KINDS))]
+        pool = []
+        for kind, position in zip(encoded["kinds"].tolist(), encoded["positions"].tolist()):
+            if kind < _ARRAY_KIND:
+                pool.append(_SCALAR_KINDS[kind][0](scalars[kind][position]))
+            else:
+                array = encoded[f"array_{position}"]
+                pool.append(array if kind == _ARRAY_KIND else array[()])
+
+        store = GraphStore(
+            encoded["opcodes"], encoded["offsets"], encoded["operands"], pool, variables
+        )
+
+    return store.root
+
+
+def reduce_expression(expression: ExpressionBase) -> tuple:
+    """
+    Implements `ExpressionBase.__reduce__`. The graph is pickled as the flat buffer written by
+    `dumps`, so pickling does not recurse through it, while its variables are pickled as
+    objects, so that expressions pickled together keep sharing the same variables.
+    """
+    encoded, variables = _encode(expression)
+    return (loads, (_pack(encoded), tuple(variables)))
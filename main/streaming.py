@@ -0,0 +1,316 @@
+"""
+Evaluates expressions over inputs that are too large to process at once, by splitting them into
+chunks along their leading axis and evaluating one chunk at a time. Inputs and outputs can be
+memory-mapped `.npy` files, so data never has to fit in memory
+"""
+
+from __future__ import annotations
+from itertools import chain
+from math import gcd
+from mmap import PAGESIZE
+from typing import Dict, Iterable, Iterator, Tuple
+import os
+import numpy as np
+
+from main.expression import ExpressionBase, Variable
+from main.compiler import Tape, compile
+
+# The reductions supported by `reduce_stream`, along with the function that reduces a chunk and
+# the function that combines two partial results
+REDUCTIONS = {
+    "sum": (np.sum, np.add),
+    "mean": (np.sum, np.add),
+    "min": (np.min, np.minimum),
+    "max": (np.max, np.maximum),
+}
+
+# The number of bytes that `compute_to_file` aims to process per window, summed over every input
+# and the output, so that the working set of a window stays in cache
+WINDOW_BYTES = 1 << 18
+
+
+def open_inputs(
+    values: Dict[Variable, float | np.ndarray | str | os.PathLike],
+) -> Dict[Variable, float | np.ndarray]:
+    """
+    Opens every value given as the path of a `.npy` file as a read-only memory map, so that it
+    is read from disk on demand instead of being loaded into memory. Other values (including
+    existing `np.memmap` arrays) are returned unchanged.
+
+    Parameters
+    ----------
+    values: Dict[Variable, float | np.ndarray | str | os.PathLike]
+        A dictionary of variables and their values or the paths of their `.npy` files
+
+    Returns
+    -------
+    Dict[Variable, float | np.ndarray]
+        A dictionary of variables and their values
+    """
+    return {
+        var: np.load(value, mmap_mode="r") if isinstance(value, (str, os.PathLike)) else value
+        for var, value in values.items()
+    }
+
+
+def iter_chunks(
+    values: Dict[Variable, float | np.ndarray], chunk_size: int
+) -> Iterator[Dict[Variable, float | np.ndarray]]:
+    """
+    Splits the values of variables into chunks along their leading axis. Every array with at
+    least one dimension is split, so they must all have the same length. Scalars are passed
+    along unchanged with every chunk.
+
+    Parameters
+    ----------
+    values: Dict[Variable, float | np.ndarray]
+        A dictionary of variables and their values
+    chunk_size: int
+        The maximum length of every chunk along the leading axis
+
+    Returns
+    -------
+    Iterator[Dict[Variable, float | np.ndarray]]
+        The values of each chunk. Array values are views, so no data is copied
+    """
+    if chunk_size < 1:
+        raise ValueError("The chunk size must be positive")
+
+    lengths = {len(value) for value in values.values() if np.ndim(value) > 0}
+    if len(lengths) > 1:
+        raise ValueError(f"Cannot split arrays of different lengths {sorted(lengths)} into chunks")
+    if not lengths:
+        yield values
+        return
+
+    for start in range(0, lengths.pop(), chunk_size):
+        yield {
+            var: value[start : start + chunk_size] if np.ndim(value) > 0 else value
+            for var, value in values.items()
+        }
+
+
+def compute_stream(
+    expression: ExpressionBase | Tape,
+    chunks: Iterable[Dict[Variable, float | np.ndarray]] | Dict[Variable, float | np.ndarray],
+    chunk_size: int | None = None,
+) -> Iterator[float | np.ndarray]:
+    """
+    Evaluates an expression over a stream of chunks, yielding the result of every chunk as soon
+    as it is computed. Only one chunk needs to be in memory at a time. The expression is
+    compiled once and every chunk is evaluated with reused buffers (see `Tape.compute_buffered`).
+
+    Parameters
+    ----------
+    expression: ExpressionBase | Tape
+        The expression to evaluate
+    chunks: Iterable[Dict[Variable, float | np.ndarray]] | Dict[Variable, float | np.ndarray]
+        Either an iterable of value dictionaries, one per chunk, or (when `chunk_size` is
+        given) a single value dictionary to be split with `iter_chunks`, whose values may be
+        paths of `.npy` files (see `open_inputs`)
+    chunk_size: int, optional
+        The length of the chunks that `chunks` should be split into
+
+    Returns
+    -------
+    Iterator[float | np.ndarray]
+        The value of the expression for every chunk
+    """
+    tape = expression if isinstance(expression, Tape) else compile(expression)
+    if chunk_size is not None:
+        chunks = iter_chunks(open_inputs(chunks), chunk_size)
+
+    for chunk in chunks:
+        yield tape.compute_buffered(chunk)
+
+
+def reduce_stream(
+    expression: ExpressionBase | Tape,
+    chunks: Iterable[Dict[Variable, float | np.ndarray]] | Dict[Variable, float | np.ndarray],
+    reduction: str = "sum",
+    chunk_size: int | None = None,
+) -> float:
+    """
+    Evaluates an expression over a stream of chunks and reduces every element of the results to
+    a single value. Reductions are applied incrementally and each chunk's result is written into
+    a reused array, so memory use does not depend on the length of the stream.
+
+    Parameters
+    ----------
+    expression: ExpressionBase | Tape
+        The expression to evaluate
+    chunks: Iterable[Dict[Variable, float | np.ndarray]] | Dict[Variable, float | np.ndarray]
+        Either an iterable of value dictionaries, one per chunk, or (when `chunk_size` is
+        given) a single value dictionary to be split with `iter_chunks`, whose values may be
+        paths of `.npy` files (see `open_inputs`)
+    reduction: str
+        One of `"sum"`, `"mean"`, `"min"` or `"max"`
+    chunk_size: int, optional
+        The length of the chunks that `chunks` should be split into
+
+    Returns
+    -------
+    float
+        The reduced value of the expression over every element of every chunk
+    """
+    if reduction not in REDUCTIONS:
+        raise ValueError(f"Unknown reduction {reduction!r}, expected one of {list(REDUCTIONS)}")
+    reduce_chunk, combine = REDUCTIONS[reduction]
+
+    tape = expression if isinstance(expression, Tape) else compile(expression)
+    if chunk_size is not None:
+        chunks = iter_chunks(open_inputs(chunks), chunk_size)
+
+    # Only the output array of the latest chunk shape is kept
+    out = None
+    total = None
+    count = 0
+    for chunk in chunks:
+        plan = tape.plan(chunk)
+        if plan.dtype is None:
+            out = None
+        elif out is None or out.shape != plan.shape or out.dtype != plan.dtype:
+            out = np.empty(plan.shape, plan.dtype)
+
+        result = plan.compute(chunk, out=out)
+        partial = reduce_chunk(result)
+        total = partial if total is None else combine(total, partial)
+        count += np.size(result)
+
+    if total is None:
+        if reduction == "sum":
+            return 0.0
+        raise ValueError(f"Cannot compute the {reduction} of an empty stream")
+    return total / count if reduction == "mean" else total
+
+
+def window_length(
+    values: Dict[Variable, float | np.ndarray], dtype: np.dtype, shape: Tuple[int, ...]
+) -> int:
+    """
+    Returns the number of rows (entries along the leading axis) that `compute_to_file` processes
+    per window. Windows hold roughly `WINDOW_BYTES` bytes of inputs and output, and are rounded
+    so that every window of the output spans a whole number of pages. Windows therefore start on
+    a page boundary as long as the first one does (see `lead_length`).
+
+    Parameters
+    ----------
+    values: Dict[Variable, float | np.ndarray]
+        A dictionary of variables and their values
+    dtype: np.dtype
+        The type of the result
+    shape: Tuple[int, ...]
+        The shape of the result
+
+    Returns
+    -------
+    int
+        The number of rows per window
+    """
+    output_row = int(np.prod(shape[1:], dtype=np.int64)) * dtype.itemsize
+    row_bytes = output_row + sum(
+        value.itemsize * (value.size // max(len(value), 1))
+        for value in values.values()
+        if np.ndim(value) > 0
+    )
+    rows = max(1, WINDOW_BYTES // max(row_bytes, 1))
+
+    alignment = PAGESIZE // gcd(PAGESIZE, max(output_row, 1))
+    if rows >= alignment:
+        rows -= rows % alignment
+    return rows
+
+
+def lead_length(offset: int, row_bytes: int) -> int:
+    """
+    Returns the number of rows to process before the first window of `compute_to_file`, so that
+    the following windows of the output start on a page boundary. The data of a `.npy` file
+    starts after its header, so it is not itself aligned to a page.
+
+    Parameters
+    ----------
+    offset: int
+        The position, in bytes, of the first row of the output within its file
+    row_bytes: int
+        The size, in bytes, of a row of the output
+
+    Returns
+    -------
+    int
+        The number of rows before the first page boundary, or 0 if no row starts on a page
+        boundary
+    """
+    for rows in range(PAGESIZE // gcd(PAGESIZE, max(row_bytes, 1))):
+        if (offset + rows * row_bytes) % PAGESIZE == 0:
+            return rows
+    return 0
+
+
+def compute_to_file(
+    expression: ExpressionBase | Tape,
+    values: Dict[Variable, float | np.ndarray | str | os.PathLike],
+    path: str | os.PathLike,
+    window: int | None = None,
+) -> np.memmap:
+    """
+    Evaluates an expression and writes the result straight into a memory-mapped `.npy` file.
+    Inputs may be memory maps or paths of `.npy` files (see `open_inputs`). The evaluation walks
+    the inputs in windows along their leading axis, so neither the inputs nor the result ever
+    need to be fully loaded in memory, and each window's working set stays in cache.
+
+    Parameters
+    ----------
+    expression: ExpressionBase | Tape
+        The expression to evaluate
+    values: Dict[Variable, float | np.ndarray | str | os.PathLike]
+        A dictionary of variables and their values or the paths of their `.npy` files. Every
+        array is split along its leading axis, so they must all have the same length
+    path: str | os.PathLike
+        The path of the `.npy` file to write the result into
+    window: int, optional
+        The number of rows to evaluate at once. By default, this is picked by `window_length`,
+        and the rows before the first page boundary of the output (see `lead_length`) are
+        evaluated on their own first
+
+    Returns
+    -------
+    np.memmap
+        The result, memory-mapped from `path`
+    """
+    tape = expression if isinstance(expression, Tape) else compile(expression)
+    values = open_inputs(values)
+
+    plan = tape.plan(values)
+    if plan.dtype is None:
+        raise ValueError("The expression evaluates to a scalar, which has no rows to write")
+
+    output = np.lib.format.open_memmap(path, mode="w+", dtype=plan.dtype, shape=plan.shape)
+    if all(np.ndim(value) == 0 for value in values.values()):
+        # The result only has rows because of array constants, so there is nothing to split
+        tape.compute_buffered(values, out=output)
+        output.flush()
+        return output
+
+    lead = 0
+    if window is None:
+        window = window_length(values, plan.dtype, plan.shape)
+        row_bytes = int(np.prod(plan.shape[1:], dtype=np.int64)) * plan.dtype.itemsize
+        lead = min(lead_length(output.offset, row_bytes), plan.shape[0])
+
+    def split(start: int, stop: int | None):
+        return {
+            var: value[start:stop] if np.ndim(value) > 0 else value for var, value in values.items()
+        }
+
+    chunks = iter_chunks(split(lead, None), window)
+    if lead:
+        chunks = chain([split(0, lead)], chunks)
+
+    start = 0
+    for chunk in chunks:
+        rows = len(next(value for value in chunk.values() if np.ndim(value) > 0))
+        tape.compute_buffered(chunk, out=output[start : start + rows])
+        start += rows
+
+    output.flush()
+    return output
@@ -0,0 +1,123 @@
+"""
+Taylor-mode differentiation. `taylor_derivatives` propagates truncated power series through a
+compiled `Tape`, so the first `K` derivatives of an expression with respect to one variable cost
+`O(K^2)` operations per node, instead of building `K` nested `ExpressionBase.backward` graphs
+whose size grows with every order
+"""
+
+from __future__ import annotations
+from math import factorial
+from typing import Dict
+import numpy as np
+
+from main.expression import ExpressionBase, Variable
+from main.compiler import NODE_TYPES, Tape, compile
+
+
+def taylor_coefficients(
+    expression: ExpressionBase | Tape,
+    var: Variable,
+    values: Dict[Variable, float | np.ndarray],
+    order: int,
+) -> np.ndarray:
+    """
+    Returns the Taylor coefficients of an expression, expanded in one variable around the given
+    values. Coefficient `k` is the `k`-th derivative with respect to `var` divided by `k!`.
+
+    Every slot of the tape holds a series whose leading axis stores its coefficients. All
+    series are padded to the same number of dimensions, so that the values of different slots
+    broadcast against each other just as they do when the tape is evaluated.
+
+    Parameters
+    ----------
+    expression: ExpressionBase | Tape
+        The expression to expand. Passing a compiled `Tape` skips compilation
+    var: Variable
+        The variable to expand in
+    values: Dict[Variable, float | np.ndarray]
+        A dictionary of variables and their values at the point to expand around. If values
+        are numpy arrays, every coefficient is computed element-wise
+    order: int
+        The highest coefficient to compute
+
+    Returns
+    -------
+    np.ndarray
+        An array of shape `(order + 1, *shape)`, where `shape` is the shape of the evaluated
+        expression
+    """
+    if order < 0:
+        raise ValueError(f"The order must be non-negative, but {order} was given")
+
+    tape = expression if isinstance(expression, Tape) else compile(expression)
+    slots = tape.forward(values)
+    ndim = max((np.ndim(slot) for slot in slots), default=0)
+
+    def constant_series(value) -> np.ndarray:
+        value = np.asarray(value)
+        series = np.zeros(
+            (order + 1,) + (1,) * (ndim - value.ndim) + value.shape,
+            dtype=np.result_type(value, float),
+        )
+        series[0] = value
+        return series
+
+    # Slots that do not depend on `var` have no series, as all of their coefficients but the
+    # first are 0
+    series = [None] * len(slots)
+    for variable, slot in tape.variables:
+        if variable == var:
+            series[slot] = constant_series(slots[slot])
+            if order > 0:
+                series[slot][1] = 1.0
+
+    for opcode, inputs, output in tape.instructions:
+        operand_series = [series[i] for i in inputs]
+        if all(s is None for s in operand_series):
+            continue
+
+        operand_series = tuple(
+            constant_series(slots[i]) if s is None else s for i, s in zip(inputs, operand_series)
+        )
+        args = [slots[i] for i in inputs]
+        series[output] = NODE_TYPES[opcode].taylor(operand_series, *args)
+
+    result = series[tape.output]
+    if result is None:
+        result = constant_series(slots[tape.output])
+    return result.reshape((order + 1,) + np.shape(slots[tape.output]))
+
+
+def taylor_derivatives(
+    expression: ExpressionBase | Tape,
+    var: Variable,
+    values: Dict[Variable, float | np.ndarray],
+    order: int,
+) -> np.ndarray:
+    """
+    Returns an expression and its derivatives up to a given order with respect to one variable,
+    evaluated at the given values using Taylor-mode differentiation (see
+    `taylor_coefficients`). This is practical for high orders, such as 6 to 8, where nesting
+    `ExpressionBase.backward` would build very large graphs.
+
+    Parameters
+    ----------
+    expression: ExpressionBase | Tape
+        The expression to differentiate. Passing a compiled `Tape` skips compilation
+    var: Variable
+        The variable to differentiate with respect to
+    values: Dict[Variable, float | np.ndarray]
+        A dictionary of variables and their values at the point where the derivatives should
+        be evaluated
+    order: int
+        The highest derivative to compute
+
+    Returns
+    -------
+    np.ndarray
+        An array of shape `(order + 1, *shape)` whose entry `k` is the `k`-th derivative, where
+        `shape` is the shape of the evaluated expression
+    """
+    coefficients = taylor_coefficients(expression, var, values, order)
+    scale = np.array([factorial(k) for k in range(order + 1)], dtype=float)
+    return coefficients * scale.reshape((order + 1,) + (1,) * (coefficients.ndim - 1))
@@ -0,0 +1,23 @@
+"""Shared helpers for the test suite"""
+
+from typing import Dict
+import numpy as np
+
+from main.expression import ExpressionBase, Variable
+
+
+def finite_difference(
+    expression: ExpressionBase,
+    values: Dict[Variable, float | np.ndarray],
+    var: Variable,
+    step: float = 1e-6,
+) -> float | np.ndarray:
+    """
+    Returns the central finite-difference approximation of the derivative of an expression with
+    respect to one variable, element-wise
+    """
+    above = dict(values)
+    below = dict(values)
+    above[var] = values[var] + step
+    below[var] = values[var] - step
+    return (expression.compute(above) - expression.compute(below)) / (2 * step)
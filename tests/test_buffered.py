@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from main.expression import Variable
+from main.compiler import compile
+from main.operations.addition import add_all
+from main.operations.exponent import exp
+from main.operations.logarithm import ln
+
+x = Variable("x")
+y = Variable("y")
+EXPRESSION = ln(x * y + 2) * exp(x / y) - (x * y + 2) ** 2 + add_all([x, y, 3.0])
+VALUES = {x: np.linspace(0.5, 1.5, 11), y: np.linspace(2.0, 1.0, 11)}
+
+
+def test_buffered_matches_compute():
+    tape = compile(EXPRESSION)
+    expected = EXPRESSION.compute(VALUES)
+    # The second call reuses the buffers of the first
+    np.testing.assert_allclose(tape.compute_buffered(VALUES), expected)
+    out = np.empty(11)
+    result = tape.compute_buffered(VALUES, out=out)
+    assert result is out
+    np.testing.assert_allclose(out, expected)
+
+
+def test_buffered_scalars():
+    tape = compile(EXPRESSION)
+    values = {x: 0.5, y: 2.0}
+    assert tape.compute_buffered(values) == pytest.approx(EXPRESSION.compute(values))
+
+
+def test_buffered_handles_changing_shapes():
+    tape = compile(EXPRESSION)
+    short = {x: VALUES[x][:4], y: VALUES[y][:4]}
+    for values in (VALUES, short, {x: 0.5, y: 2.0}, VALUES, short):
+        np.testing.assert_allclose(tape.compute_buffered(values), EXPRESSION.compute(values))
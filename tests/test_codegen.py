@@ -0,0 +1,23 @@
+import numpy as np
+
+from main.expression import Variable
+from main.codegen import to_python_function
+from main.operations.addition import add_all
+from main.operations.exponent import exp
+from main.operations.logarithm import ln
+
+x = Variable("x")
+y = Variable("y")
+EXPRESSION = ln(x * y + 2) * exp(x / y) - (x * y + 2) ** 2 + add_all([x, y, 3.0])
+VALUES = {x: np.linspace(0.5, 1.5, 11), y: np.linspace(2.0, 1.0, 11)}
+
+
+def test_codegen_matches_compute():
+    function = to_python_function(EXPRESSION, [x, y])
+    np.testing.assert_allclose(function(VALUES[x], VALUES[y]), EXPRESSION.compute(VALUES))
+
+
+def test_codegen_renames_clashing_arguments():
+    first, second, third = Variable("arg1"), Variable("1bad"), Variable("arg1")
+    function = to_python_function(first * 2 + second * 3 + third, [first, second, third])
+    assert function(1.0, 10.0, 100.0) == 132.0
@@ -0,0 +1,63 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from main.expression import Variable
+from main.compiler import compile, compile_all
+from main.operations.addition import add_all
+from main.operations.exponent import exp
+from main.operations.logarithm import ln
+
+x = Variable("x")
+y = Variable("y")
+EXPRESSION = ln(x * y + 2) * exp(x / y) - (x * y + 2) ** 2 + add_all([x, y, 3.0])
+VALUES = {x: np.linspace(0.5, 1.5, 11), y: np.linspace(2.0, 1.0, 11)}
+
+
+def test_tape_matches_compute():
+    np.testing.assert_allclose(compile(EXPRESSION).compute(VALUES), EXPRESSION.compute(VALUES))
+
+
+def test_tape_scalars():
+    values = {x: 0.5, y: 2.0}
+    assert compile(EXPRESSION).compute(values) == pytest.approx(EXPRESSION.compute(values))
+
+
+def test_shared_nodes_get_one_slot():
+    shared = x * y + 2
+    tape = compile(ln(shared) * shared)
+    assert len(tape) == 4
+
+
+def test_compute_all():
+    tape = compile_all([EXPRESSION, x * y])
+    first, second = tape.compute_all(VALUES)
+    np.testing.assert_allclose(first, EXPRESSION.compute(VALUES))
+    np.testing.assert_allclose(second, VALUES[x] * VALUES[y])
+
+
+def test_deep_tape():
+    expression = x
+    for _ in range(20000):
+        expression = expression * 1.0001
+    assert compile(expression).compute({x: 1.0}) == pytest.approx(1.0001**20000)
+
+
+def test_compute_frees_intermediates():
+    expression = x
+    for _ in range(20):
+        expression = exp(expression * 0.01) + y
+    tape = compile_all([expression, expression * 2])
+    values = {x: np.linspace(0.0, 1.0, 100000), y: 0.5}
+
+    tracemalloc.start()
+    try:
+        first, second = tape.compute_all(values)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    # Each array takes 800 kB, and the tape has 60 intermediates
+    assert peak < 8 * values[x].nbytes
+    np.testing.assert_allclose(first, expression.compute(values))
+    np.testing.assert_allclose(second, 2 * first)
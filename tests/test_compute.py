@@ -0,0 +1,39 @@
+import numpy as np
+
+from main import expression as expression_module
+from main.expression import Variable, Constant
+from main.operations.addition import add
+from main.operations.multiplication import multiply
+
+x = Variable("x")
+HALF = Constant(0.5)
+
+
+def test_shared_nodes_are_evaluated_once():
+    # As a tree, this graph has 2^100 leaves, so it can only be evaluated as a DAG
+    expression = x
+    for _ in range(100):
+        expression = add(multiply(expression, HALF), multiply(expression, HALF))
+    np.testing.assert_allclose(expression.compute({x: np.arange(3.0)}), np.arange(3.0))
+
+
+def test_compute_memoized_is_an_alias():
+    expression = multiply(x, add(x, HALF))
+    assert expression.compute_memoized({x: 2.0}) == expression.compute({x: 2.0}) == 5.0
+
+
+def test_schedules_are_cached_per_expression(monkeypatch):
+    monkeypatch.setattr(expression_module, "SCHEDULE_CACHE_SIZE", 2)
+    expression_module._SCHEDULE_CACHE.clear()
+    expressions = [add(x, Constant(float(i))) for i in range(4)]
+    for i, expression in enumerate(expressions):
+        assert expression.compute({x: 1.0}) == 1.0 + i
+    assert len(expression_module._SCHEDULE_CACHE) == 2
+
+    # A schedule is only used for the expression it was built for, even if the identity of
+    # that expression is reused once it has been freed
+    key = id(expressions[-1])
+    del expressions, expression
+    replacement = multiply(x, HALF)
+    expression_module._SCHEDULE_CACHE[id(replacement)] = expression_module._SCHEDULE_CACHE[key]
+    assert replacement.compute({x: 4.0}) == 2.0
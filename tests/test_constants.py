@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from main.expression import Variable, Constant, is_close, set_constant_tolerance
+from main.operations.multiplication import Product
+
+x = Variable("x")
+y = Variable("y")
+
+
+@pytest.fixture
+def exact_constants():
+    set_constant_tolerance(0, 0)
+    yield
+    set_constant_tolerance()
+
+
+@pytest.mark.parametrize(
+    "value, target",
+    [(1.0, 1.0), (1.000001, 1.0), (1.001, 1.0), (1e-9, 0), (3, 3.0), (True, 1)],
+)
+def test_is_close_matches_allclose(value, target):
+    assert is_close(value, target) == np.allclose(value, target)
+    assert is_close(np.array([value, value]), target) == np.allclose(value, target)
+
+
+def test_simplifiers_use_the_tolerance(exact_constants):
+    assert isinstance(x * 1.000000001, Product)
+    set_constant_tolerance()
+    assert x * 1.000000001 is x
+
+
+def test_constant_classes_follow_the_tolerance(exact_constants):
+    constant = Constant(1e-12)
+    assert not is_close(constant.value, 0)
+    set_constant_tolerance()
+    assert (x * constant).compute({x: 5.0}) == 0
+
+
+def test_changing_the_tolerance_clears_cached_derivatives(exact_constants):
+    expression = x * y * 1e-12
+    assert expression.backward(x).compute({y: 1.0}) == 1e-12
+    set_constant_tolerance()
+    assert expression.backward(x).compute({y: 1.0}) == 0
@@ -0,0 +1,32 @@
+import numpy as np
+
+from main.expression import Variable, Constant, postorder
+from main.cse import cse, cse_all
+from main.operations.addition import Sum
+from main.operations.logarithm import ln
+from main.operations.multiplication import Product
+
+x = Variable("x")
+y = Variable("y")
+VALUES = {x: np.linspace(0.5, 1.5, 11), y: np.linspace(2.0, 1.0, 11)}
+
+
+def test_cse_preserves_value():
+    expression = ln(x * y + 1) + ln(y * x + 1)
+    reduced, removed = cse(expression)
+    assert removed > 0
+    np.testing.assert_allclose(reduced.compute(VALUES), expression.compute(VALUES))
+
+
+def test_cse_merges_trees_built_without_interning():
+    # Building the nodes directly gives a tree in which the product appears twice
+    expression = Sum(Product(x, y), Product(y, x))
+    reduced, removed = cse(expression)
+    assert removed == 1
+    assert reduced.a is reduced.b
+
+
+def test_cse_all_shares_nodes_across_expressions():
+    (first, second), _ = cse_all([Sum(Product(x, y), Constant(1)), Product(y, x)])
+    assert first.a is second
+    assert len(postorder(first)) == 5
@@ -0,0 +1,26 @@
+from main import expression as module
+from main.expression import Variable, clear_derivative_cache
+from main.operations.exponent import exp
+
+x = Variable("x")
+y = Variable("y")
+
+
+def test_cached_derivatives_are_reused():
+    expression = exp(x * y)
+    assert expression.backward(x) is expression.backward(x)
+
+
+def test_cached_derivatives_are_not_shared_between_close_coefficients():
+    assert (x * 1000.0).backward(x).compute({}) == 1000.0
+    assert (x * 1000.009).backward(x).compute({}) == 1000.009
+
+
+def test_cache_is_bounded(monkeypatch):
+    clear_derivative_cache()
+    monkeypatch.setattr(module, "DERIVATIVE_CACHE_SIZE", 3)
+    for power in range(2, 10):
+        (x**power).backward(x)
+    assert len(module._DERIVATIVE_CACHE) <= 3
+    clear_derivative_cache()
+    assert not module._DERIVATIVE_CACHE
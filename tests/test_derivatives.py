@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from main.expression import Variable, Constant
+from main.operations.addition import add_all
+from main.operations.division import divide
+from main.operations.exponent import exp, exponent
+from main.operations.logarithm import ln, log
+from main.operations.multiplication import multiply_all
+from tests.helpers import finite_difference
+
+x = Variable("x")
+y = Variable("y")
+VALUES = {x: np.linspace(0.3, 2.0, 7), y: np.linspace(1.1, 0.4, 7)}
+
+EXPRESSIONS = {
+    "sum": lambda: x + y,
+    "difference": lambda: x - y * 3,
+    "product": lambda: x * y,
+    "quotient": lambda: x / y,
+    "power": lambda: x**2.5,
+    "whole power": lambda: (x * y) ** 3,
+    "exponent": lambda: exponent(2.0, x * y),
+    "natural exponent": lambda: exp(x / y),
+    "logarithm": lambda: log(10, x + y),
+    "natural logarithm": lambda: ln(x * y),
+    "n-ary sum": lambda: add_all([x, y, x * y, 2.0]),
+    "n-ary product": lambda: multiply_all([x, y, x + y, 2.0]),
+    "nested": lambda: ln(exp(x * y) + x**2) / (y - x * 2 + 5),
+}
+
+
+@pytest.mark.parametrize("name", EXPRESSIONS)
+@pytest.mark.parametrize("var", [x, y], ids=["x", "y"])
+def test_backward_matches_finite_differences(name, var):
+    expression = EXPRESSIONS[name]()
+    derivative = expression.backward(var).compute(VALUES)
+    np.testing.assert_allclose(
+        derivative * np.ones(7), finite_difference(expression, VALUES, var), rtol=1e-5
+    )
+
+
+def test_quotient_derivative_of_denominator():
+    # d/dy (x / y) = -x / y^2
+    derivative = divide(x, y).backward(y)
+    np.testing.assert_allclose(derivative.compute({x: 3.0, y: 2.0}), -0.75)
+
+
+def test_logarithm_derivative_uses_base():
+    # d/dx log_10(x) = 1 / (x ln 10)
+    derivative = log(10, x).backward(x)
+    np.testing.assert_allclose(derivative.compute({x: 4.0}), 1 / (4.0 * np.log(10)))
+
+
+def test_second_derivative():
+    expression = x**3 * y
+    np.testing.assert_allclose(
+        expression.backward(x).backward(x).compute({x: 2.0, y: 5.0}), 6 * 2.0 * 5.0
+    )
+
+
+def test_constant_derivative_is_zero():
+    assert Constant(4.0).backward(x).compute({}) == 0
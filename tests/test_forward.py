@@ -0,0 +1,38 @@
+import numpy as np
+
+from main.expression import Variable
+from main.forward import jvp
+from main.gradient import grad
+from main.operations.exponent import exp
+from main.operations.logarithm import ln
+
+x = Variable("x")
+y = Variable("y")
+z = Variable("z")
+EXPRESSION = ln(x * y + z**2) * exp(x / y) - z / (x + 3)
+VALUES = {x: np.linspace(0.5, 1.5, 5), y: np.linspace(2.0, 1.0, 5), z: 0.7}
+
+
+def test_jvp_matches_finite_differences():
+    tangents = {x: 1.0, y: -2.0, z: 0.5}
+    value, derivative = jvp(EXPRESSION, VALUES, tangents)
+
+    step = 1e-6
+    above = {var: VALUES[var] + step * tangents[var] for var in VALUES}
+    below = {var: VALUES[var] - step * tangents[var] for var in VALUES}
+    expected = (EXPRESSION.compute(above) - EXPRESSION.compute(below)) / (2 * step)
+    np.testing.assert_allclose(value, EXPRESSION.compute(VALUES))
+    np.testing.assert_allclose(derivative, expected, rtol=1e-5)
+
+
+def test_jvp_with_several_directions():
+    directions = np.eye(3)
+    tangents = {var: directions[:, [i]] for i, var in enumerate([x, y, z])}
+    _, derivatives = jvp(EXPRESSION, VALUES, tangents)
+    for row, partial in zip(derivatives, grad(EXPRESSION, VALUES, [x, y, z])):
+        np.testing.assert_allclose(row, partial * np.ones(5))
+
+
+def test_jvp_without_tangents():
+    value, derivative = jvp(x * y, {x: 2.0, y: 3.0}, {})
+    assert (value, derivative) == (6.0, 0.0)
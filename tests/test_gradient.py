@@ -0,0 +1,26 @@
+import numpy as np
+
+from main.expression import Variable
+from main.compiler import compile
+from main.gradient import grad
+from main.operations.exponent import exp
+from main.operations.logarithm import ln
+from tests.helpers import finite_difference
+
+x = Variable("x")
+y = Variable("y")
+z = Variable("z")
+EXPRESSION = ln(x * y + z**2) * exp(x / y) - z / (x + 3)
+VALUES = {x: np.linspace(0.5, 1.5, 5), y: np.linspace(2.0, 1.0, 5), z: 0.7}
+
+
+def test_grad_matches_finite_differences():
+    partials = grad(EXPRESSION, VALUES, [x, y, z])
+    for var, partial in zip([x, y, z], partials):
+        np.testing.assert_allclose(
+            partial * np.ones(5), finite_difference(EXPRESSION, VALUES, var), rtol=1e-5
+        )
+
+
+def test_grad_of_unused_variable_is_zero():
+    assert grad(compile(x * y), {x: 1.0, y: 2.0}, [z]) == [0.0]
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from main.expression import Variable, postorder
+from main.graph_store import GraphBuilder, GraphStore
+from main.operations.addition import Sum, add_all
+from main.operations.exponent import exp
+from main.operations.logarithm import ln
+from main.operations.multiplication import Product
+from main.operations.power import Power
+
+x = Variable("x")
+y = Variable("y")
+EXPRESSION = ln(x * y + 2) * exp(x / y) - (x * y + 2) ** 2 + add_all([x, y, 3.0])
+VALUES = {x: np.linspace(0.5, 1.5, 11), y: np.linspace(2.0, 1.0, 11)}
+
+
+def test_graph_store_matches_compute():
+    store = GraphStore.from_expression(EXPRESSION)
+    np.testing.assert_allclose(store.compute(VALUES), EXPRESSION.compute(VALUES))
+    for partial, expected in zip(
+        store.grad(VALUES, [x, y]), [EXPRESSION.backward(x), EXPRESSION.backward(y)]
+    ):
+        np.testing.assert_allclose(partial, expected.compute(VALUES))
+
+
+def test_graph_builder():
+    builder = GraphBuilder()
+    a = builder.variable(x)
+    b = builder.variable(y)
+    product = builder.add(Product, a, b)
+    squared = builder.add(Power, product, builder.payload(2))
+    builder.add(Sum, squared, builder.constant(1.0))
+    store = builder.build()
+
+    expression = (x * y) ** 2 + 1.0
+    assert store.root == expression
+    np.testing.assert_allclose(store.compute(VALUES), expression.compute(VALUES))
+    np.testing.assert_allclose(store.grad(VALUES, [x])[0], expression.backward(x).compute(VALUES))
+
+
+def test_graph_builder_rejects_unknown_operands():
+    builder = GraphBuilder()
+    a = builder.variable(x)
+    with pytest.raises(ValueError):
+        builder.add(Product, a, a + 1)
+
+
+def test_graph_store_shares_nodes():
+    store = GraphStore.from_expression(EXPRESSION)
+    assert len(store) == len(postorder(EXPRESSION))
+    assert store.root is EXPRESSION
+
+
+def test_graph_store_rejects_missing_variables():
+    store = GraphStore.from_expression(x * y)
+    with pytest.raises(ValueError):
+        GraphStore(store.opcodes, store.offsets, store.operands, store.constants, [x])
@@ -0,0 +1,38 @@
+import numpy as np
+
+from main.expression import Variable, Constant
+from main.operations.addition import Sum
+from main.operations.exponent import Exponent
+from main.operations.logarithm import Logarithm
+from main.operations.multiplication import Product
+
+x = Variable("x")
+y = Variable("y")
+
+
+def test_constants_are_compared_exactly():
+    assert Constant(2) == Constant(2.0)
+    assert hash(Constant(2.0)) == hash(Constant(np.float64(2.0)))
+    assert Constant(1.0) != Constant(1.000001)
+    assert Constant(np.array([1.0, 2.0])) == Constant(np.array([1.0, 2.0]))
+
+
+def test_constants_hash_their_value():
+    assert hash(Constant(1.0)) != hash(Constant(2.0))
+    assert hash(Exponent(2.0, x)) != hash(Exponent(3.0, x))
+    assert hash(Logarithm(2.0, x)) != hash(Logarithm(3.0, x))
+
+
+def test_terms_that_differ_by_a_coefficient_are_unequal():
+    assert x * 2.0 + y != x * 2.0001 + y
+    assert Exponent(2.0, x) != Exponent(2.0001, x)
+
+
+def test_commutative_nodes_are_equal_in_any_order():
+    assert Product(Sum(x, Constant(1.0)), y) == Product(y, Sum(Constant(1.0), x))
+    assert Product(x, y) != Product(x, x)
+
+
+def test_equal_nodes_have_equal_hashes():
+    assert hash(Sum(x, y)) == hash(Sum(y, x))
+    assert hash(Product(Sum(x, Constant(1)), y)) == hash(Product(y, Sum(Constant(1.0), x)))
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from main.expression import Variable
+from main.hessian import hessian
+from main.operations.exponent import exp
+from main.operations.logarithm import ln
+
+x = Variable("x")
+y = Variable("y")
+z = Variable("z")
+EXPRESSION = ln(x * y + z**2) * exp(x / y)
+WRT = [x, y, z]
+
+
+def _nested_backward(point):
+    return [[EXPRESSION.backward(a).backward(b).compute(point) for b in WRT] for a in WRT]
+
+
+@pytest.mark.parametrize("eliminate_common", [True, False])
+def test_hessian_matches_nested_backward(eliminate_common):
+    point = {x: 0.8, y: 1.7, z: 0.3}
+    np.testing.assert_allclose(
+        hessian(EXPRESSION, WRT, eliminate_common).compute(point),
+        _nested_backward(point),
+        rtol=1e-10,
+    )
+
+
+def test_hessian_over_arrays():
+    point = {x: np.array([0.8, 1.2]), y: 1.7, z: np.array([0.3, 0.1])}
+    result = hessian(EXPRESSION, WRT).compute(point)
+    assert result.shape == (3, 3, 2)
+    expected = np.array(
+        [[np.broadcast_to(entry, (2,)) for entry in row] for row in _nested_backward(point)]
+    )
+    np.testing.assert_allclose(result, expected, rtol=1e-10)
+    np.testing.assert_array_equal(result, result.swapaxes(0, 1))
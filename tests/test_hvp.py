@@ -0,0 +1,28 @@
+import numpy as np
+
+from main.expression import Variable
+from main.gradient import hvp
+from main.operations.exponent import exp
+from main.operations.logarithm import ln
+
+x = Variable("x")
+y = Variable("y")
+z = Variable("z")
+EXPRESSION = ln(x * y + z**2) * exp(x / y) - z / (x + 3)
+
+
+def test_hvp_matches_backward():
+    point = {x: 0.8, y: 1.7, z: 0.3}
+    v = {x: 1.0, y: -0.5, z: 2.0}
+    products = hvp(EXPRESSION, point, v, [x, y, z])
+    for row, product in zip([x, y, z], products):
+        first = EXPRESSION.backward(row)
+        expected = sum(first.backward(col).compute(point) * v[col] for col in v)
+        np.testing.assert_allclose(product, expected, rtol=1e-8)
+
+
+def test_hvp_of_arrays_is_element_wise():
+    point = {x: np.linspace(0.5, 1.5, 5), y: np.linspace(2.0, 1.0, 5), z: 0.3}
+    (product,) = hvp(EXPRESSION, point, {x: 1.0})
+    expected = EXPRESSION.backward(x).backward(x).compute(point)
+    np.testing.assert_allclose(product, expected, rtol=1e-8)
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from main.expression import Variable
+from main.operations.exponent import Exponent, exp
+from main.operations.logarithm import Logarithm
+from main.operations.power import Power
+
+x = Variable("x")
+y = Variable("y")
+
+
+def test_equal_subexpressions_are_shared():
+    assert (x * y + 2) is (x * y + 2)
+    assert exp(x * 2.0) is exp(x * 2.0)
+    assert (x * 2) is not (x * 2.0)
+
+
+def test_changing_an_array_does_not_change_constants():
+    array = np.array([1.0, 2.0])
+    expression = x * array
+    array[0] = 5.0
+    np.testing.assert_array_equal(expression.compute({x: 1.0}), [1.0, 2.0])
+    np.testing.assert_array_equal((x * np.array([1.0, 2.0])).compute({x: 1.0}), [1.0, 2.0])
+
+
+def test_large_constants_are_not_interned():
+    array = np.arange(10000.0)
+    assert (x * array) is not (x * array)
+    assert (x * array.reshape(100, 100)[:1]) is (x * array.reshape(100, 100)[:1])
+
+
+def test_nodes_freeze_array_payloads():
+    array = np.array([2.0, 3.0])
+    payloads = [Power(x, array).power, Exponent(array, x).base, Logarithm(array, x).base]
+    array[0] = 5.0
+    for payload in payloads:
+        np.testing.assert_array_equal(payload, [2.0, 3.0])
+        with pytest.raises(ValueError):
+            payload[0] = 5.0
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from main.expression import Variable
+from main.jacobian import jacobian
+from main.operations.exponent import exp
+from main.operations.logarithm import ln
+
+x = Variable("x")
+y = Variable("y")
+z = Variable("z")
+OUTPUTS = [x * y, exp(y) + z, ln(x) * z**2]
+VALUES = {x: np.array([1.5, 2.0]), y: np.array([0.5, -1.0]), z: 3.0}
+
+
+def expected_jacobian():
+    return np.array(
+        [
+            [
+                entry.compute(VALUES) * np.ones(2)
+                for entry in (out.backward(x), out.backward(y), out.backward(z))
+            ]
+            for out in OUTPUTS
+        ]
+    )
+
+
+@pytest.mark.parametrize("mode", ["forward", "reverse", "auto"])
+def test_jacobian_matches_backward(mode):
+    np.testing.assert_allclose(jacobian(OUTPUTS, [x, y, z], VALUES, mode), expected_jacobian())
+
+
+def test_jacobian_rejects_unknown_modes():
+    with pytest.raises(ValueError):
+        jacobian(OUTPUTS, [x, y, z], VALUES, "sideways")
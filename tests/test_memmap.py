@@ -0,0 +1,48 @@
+from mmap import PAGESIZE
+
+import numpy as np
+
+from main.expression import Variable
+from main.streaming import compute_to_file, lead_length, open_inputs, window_length
+from main.operations.exponent import exp
+
+x = Variable("x")
+y = Variable("y")
+EXPRESSION = exp(x / 10) * y + x
+VALUES = {x: np.linspace(0.0, 5.0, 1001), y: 2.0}
+
+
+def test_open_inputs_maps_files(tmp_path):
+    path = tmp_path / "x.npy"
+    np.save(path, VALUES[x])
+    opened = open_inputs({x: path, y: 2.0})
+    assert isinstance(opened[x], np.memmap)
+    assert opened[y] == 2.0
+    np.testing.assert_array_equal(opened[x], VALUES[x])
+
+
+def test_compute_to_file(tmp_path):
+    path = tmp_path / "x.npy"
+    np.save(path, VALUES[x])
+    output = compute_to_file(EXPRESSION, {x: path, y: 2.0}, tmp_path / "out.npy", window=64)
+    np.testing.assert_allclose(np.load(tmp_path / "out.npy"), EXPRESSION.compute(VALUES))
+    np.testing.assert_allclose(output, EXPRESSION.compute(VALUES))
+
+
+def test_windows_start_on_page_boundaries(tmp_path):
+    values = {x: np.linspace(0.0, 5.0, 200000), y: 2.0}
+    output = compute_to_file(EXPRESSION, values, tmp_path / "out.npy")
+    np.testing.assert_allclose(output, EXPRESSION.compute(values))
+
+    row_bytes = output.dtype.itemsize
+    lead = lead_length(output.offset, row_bytes)
+    window = window_length(values, output.dtype, output.shape)
+    assert (output.offset + lead * row_bytes) % PAGESIZE == 0
+    assert (window * row_bytes) % PAGESIZE == 0
+
+
+def test_compute_to_file_without_input_arrays(tmp_path):
+    expression = x * np.arange(5.0)
+    output = compute_to_file(expression, {x: 2.0}, tmp_path / "out.npy")
+    np.testing.assert_allclose(np.load(tmp_path / "out.npy"), 2.0 * np.arange(5.0))
+    np.testing.assert_allclose(output, 2.0 * np.arange(5.0))
@@ -0,0 +1,36 @@
+import numpy as np
+
+from main.expression import Variable, Constant
+from main.operations.addition import NarySum, add_all
+from main.operations.multiplication import NaryProduct, multiply_all
+
+x = Variable("x")
+y = Variable("y")
+z = Variable("z")
+
+
+def test_add_all_flattens_and_folds_constants():
+    expression = add_all([x + y, 2.0, add_all([z, 3.0])])
+    assert isinstance(expression, NarySum)
+    assert expression.terms == (x, y, z, Constant(5.0))
+    assert expression.compute({x: 1.0, y: 2.0, z: 3.0}) == 11.0
+
+
+def test_multiply_all_flattens_and_folds_constants():
+    expression = multiply_all([x * y, 2.0, multiply_all([z, 3.0])])
+    assert isinstance(expression, NaryProduct)
+    assert expression.factors == (x, y, z, Constant(6.0))
+    assert expression.compute({x: 1.0, y: 2.0, z: 3.0}) == 36.0
+
+
+def test_trivial_nary_nodes_collapse():
+    assert add_all([x, 0.0]) is x
+    assert multiply_all([x, 1.0]) is x
+    assert multiply_all([x, y, 0.0]).compute({}) == 0
+
+
+def test_nary_nodes_are_commutative():
+    assert add_all([x, y, z]) == add_all([z, x, y])
+    np.testing.assert_allclose(
+        multiply_all([x, y, z]).backward(y).compute({x: 2.0, y: 3.0, z: 4.0}), 8.0
+    )
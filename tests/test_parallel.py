@@ -0,0 +1,58 @@
+import gc
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pytest
+
+from main import parallel
+from main.expression import Variable
+from main.parallel import parallel_compute, shared_array
+from main.operations.addition import add_all
+from main.operations.exponent import exp
+from main.operations.logarithm import ln
+
+x = Variable("x")
+y = Variable("y")
+EXPRESSION = add_all([exp(x / 10) * y, ln(x + 1), x * x])
+VALUES = {x: np.linspace(0.0, 5.0, 1001), y: np.linspace(1.0, 2.0, 1001)}
+
+
+def test_parallel_compute_matches_compute():
+    result = parallel_compute(EXPRESSION, VALUES, workers=2)
+    np.testing.assert_allclose(result, EXPRESSION.compute(VALUES))
+
+
+def test_parallel_compute_with_scalar_input():
+    values = {x: VALUES[x], y: 3.0}
+    np.testing.assert_allclose(
+        parallel_compute(EXPRESSION, values, workers=3), EXPRESSION.compute(values)
+    )
+
+
+def test_parallel_compute_of_scalars_runs_in_process():
+    values = {x: 0.5, y: 3.0}
+    assert parallel_compute(EXPRESSION, values, workers=2) == pytest.approx(
+        EXPRESSION.compute(values)
+    )
+
+
+def test_parallel_compute_reads_shared_inputs_in_place():
+    shared = shared_array(VALUES[x].shape)
+    shared[...] = VALUES[x]
+    values = {x: shared, y: VALUES[y]}
+    result = parallel_compute(EXPRESSION, values, workers=2)
+    np.testing.assert_allclose(result, EXPRESSION.compute(VALUES))
+
+
+def test_parallel_result_frees_its_shared_memory():
+    result = parallel_compute(EXPRESSION, VALUES, workers=2)
+    name = parallel._SHARED_NAMES[id(result)]
+    view = result[:10]
+    del result
+    gc.collect()
+    np.testing.assert_allclose(view, EXPRESSION.compute(VALUES)[:10])
+
+    del view
+    gc.collect()
+    with pytest.raises(FileNotFoundError):
+        SharedMemory(name=name)
@@ -0,0 +1,61 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from main.expression import Variable, postorder
+from main.serialization import dumps, loads, symbols
+from main.operations.exponent import exp
+from main.operations.logarithm import log
+
+x = Variable("x")
+y = Variable("y")
+EXPRESSION = log(10, x * y + 2) * exp(x) + (x * y + 2) ** np.array([1.0, 2.0]) - 3
+
+
+def test_round_trip():
+    data = dumps(EXPRESSION)
+    assert symbols(data) == ["x", "y"]
+    loaded = loads(data, [x, y])
+    assert loaded == EXPRESSION
+    values = {x: 0.5, y: 1.5}
+    np.testing.assert_allclose(loaded.compute(values), EXPRESSION.compute(values))
+
+
+def test_round_trip_with_new_variables():
+    loaded = loads(dumps(EXPRESSION))
+    a, b = sorted(_variables(loaded), key=lambda var: var.name)
+    np.testing.assert_allclose(
+        loaded.compute({a: 0.5, b: 1.5}), EXPRESSION.compute({x: 0.5, y: 1.5})
+    )
+
+
+def test_loads_with_variables_by_name():
+    loaded = loads(dumps(EXPRESSION), {"y": y})
+    assert y in _variables(loaded)
+    assert x not in _variables(loaded)
+    with pytest.raises(ValueError):
+        loads(dumps(EXPRESSION), [x])
+
+
+def test_shared_nodes_stay_shared():
+    shared = x * y + 2
+    loaded = loads(dumps(shared - exp(shared)), [x, y])
+    assert loaded.a is loaded.b.power
+
+
+def test_pickle_keeps_variables_shared():
+    expression, variable = pickle.loads(pickle.dumps((EXPRESSION, x)))
+    assert variable in _variables(expression)
+
+
+def test_pickle_deep_expression():
+    expression = x
+    for _ in range(10000):
+        expression = expression * 1.0001
+    loaded = pickle.loads(pickle.dumps(expression))
+    assert loaded.compute({_variables(loaded).pop(): 1.0}) == expression.compute({x: 1.0})
+
+
+def _variables(expression):
+    return {node for node in postorder(expression) if isinstance(node, Variable)}
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from main.expression import Variable, Constant, postorder
+from main.operations.addition import add_all
+from main.operations.division import divide
+from main.operations.exponent import exp, exponent
+from main.operations.logarithm import ln, log
+from main.operations.multiplication import multiply_all
+from main.operations.subtraction import subtract
+
+x = Variable("x")
+y = Variable("y")
+EXPRESSION = subtract(
+    divide(log(10, x * y) + ln(x) ** 2, exponent(2.0, y) * exp(x)),
+    add_all([x, y, 3.0]) * multiply_all([x, y, 2.0]),
+)
+NODES = postorder(EXPRESSION)
+
+
+@pytest.mark.parametrize("node", NODES, ids=lambda node: type(node).__name__)
+def test_nodes_have_no_dict(node):
+    assert not hasattr(node, "__dict__")
+
+
+@pytest.mark.parametrize("node", NODES, ids=lambda node: type(node).__name__)
+def test_nodes_are_immutable(node):
+    with pytest.raises(AttributeError):
+        node.extra = 1
+    with pytest.raises(AttributeError):
+        node._hash = 0
+    with pytest.raises(AttributeError):
+        del node._hash
+
+
+def test_constant_values_are_read_only():
+    with pytest.raises(ValueError):
+        Constant(np.arange(3.0)).value[0] = 1.0
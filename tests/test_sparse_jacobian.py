@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+from main.expression import Variable
+from main.jacobian import jacobian, sparse_jacobian, sparsity_pattern
+from main.operations.exponent import exp
+from main.operations.logarithm import ln
+
+x = Variable("x")
+y = Variable("y")
+z = Variable("z")
+OUTPUTS = [x * y, exp(y) + z, ln(x) * z**2]
+VALUES = {x: np.array([1.5, 2.0]), y: np.array([0.5, -1.0]), z: 3.0}
+
+
+@pytest.mark.parametrize("mode", ["forward", "reverse"])
+def test_sparse_jacobian_matches_dense(mode):
+    sparse = sparse_jacobian(OUTPUTS, [x, y, z], VALUES, mode)
+    np.testing.assert_allclose(sparse.to_dense(), jacobian(OUTPUTS, [x, y, z], VALUES))
+
+
+def test_sparsity_pattern():
+    rows, cols = sparsity_pattern(OUTPUTS, [x, y, z])
+    assert sorted(zip(rows.tolist(), cols.tolist())) == [
+        (0, 0),
+        (0, 1),
+        (1, 1),
+        (1, 2),
+        (2, 0),
+        (2, 2),
+    ]
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from main.expression import Variable
+from main.compiler import PLAN_CACHE_SIZE, compile
+from main.streaming import compute_stream, iter_chunks, reduce_stream
+from main.operations.exponent import exp
+
+x = Variable("x")
+y = Variable("y")
+EXPRESSION = exp(x / 10) * y + x
+VALUES = {x: np.linspace(0.0, 5.0, 1001), y: 2.0}
+
+
+def test_compute_stream_matches_compute():
+    chunks = list(compute_stream(EXPRESSION, VALUES, chunk_size=128))
+    assert len(chunks) == 8
+    np.testing.assert_allclose(np.concatenate(chunks), EXPRESSION.compute(VALUES))
+
+
+def test_iter_chunks():
+    chunks = list(iter_chunks(VALUES, 400))
+    assert [len(chunk[x]) for chunk in chunks] == [400, 400, 201]
+    assert all(chunk[y] == 2.0 for chunk in chunks)
+    assert list(iter_chunks({y: 2.0}, 400)) == [{y: 2.0}]
+    with pytest.raises(ValueError):
+        next(iter_chunks({x: VALUES[x], y: VALUES[x][:10]}, 400))
+
+
+def test_compute_stream_over_iterable():
+    chunks = iter_chunks(VALUES, 300)
+    result = np.concatenate([chunk.copy() for chunk in compute_stream(EXPRESSION, chunks)])
+    np.testing.assert_allclose(result, EXPRESSION.compute(VALUES))
+
+
+@pytest.mark.parametrize("reduction", ["sum", "mean", "min", "max"])
+def test_reduce_stream(reduction):
+    expected = getattr(np, reduction)(EXPRESSION.compute(VALUES))
+    result = reduce_stream(compile(EXPRESSION), VALUES, reduction, chunk_size=100)
+    assert result == pytest.approx(expected)
+
+
+def test_reduce_empty_stream():
+    assert reduce_stream(EXPRESSION, [], "sum") == 0.0
+    with pytest.raises(ValueError):
+        reduce_stream(EXPRESSION, [], "max")
+
+
+def test_chunks_of_many_lengths_keep_few_plans():
+    tape = compile(EXPRESSION)
+    lengths = np.arange(1, 51)
+    chunks = [{x: np.linspace(0.0, 1.0, n), y: 2.0} for n in lengths]
+    total = reduce_stream(tape, chunks, "sum")
+    assert total == pytest.approx(sum(EXPRESSION.compute(chunk).sum() for chunk in chunks))
+    assert len(tape._plans) <= PLAN_CACHE_SIZE
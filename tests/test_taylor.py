@@ -0,0 +1,79 @@
+from math import factorial
+
+import numpy as np
+import pytest
+
+from main.expression import Variable, Constant
+from main.compiler import compile
+from main.operations.exponent import exp, exponent
+from main.operations.logarithm import ln, log
+from main.operations.multiplication import multiply_all
+from main.taylor import taylor_coefficients, taylor_derivatives
+
+x = Variable("x")
+y = Variable("y")
+
+
+def test_exponential():
+    np.testing.assert_allclose(taylor_derivatives(exp(x), x, {x: 0.3}, 8), [np.exp(0.3)] * 9)
+
+
+def test_geometric_series():
+    coefficients = taylor_coefficients(Constant(1) / (Constant(1) - x), x, {x: 0.3}, 8)
+    np.testing.assert_allclose(coefficients, [1 / 0.7 ** (k + 1) for k in range(9)])
+
+
+@pytest.mark.parametrize("base", [np.e, 10.0])
+def test_logarithm(base):
+    coefficients = taylor_coefficients(log(base, x), x, {x: 0.3}, 8)
+    expected = [(-1) ** (k + 1) / (k * 0.3**k * np.log(base)) for k in range(1, 9)]
+    np.testing.assert_allclose(coefficients[1:], expected)
+
+
+@pytest.mark.parametrize("power", [2.5, -1.5, 0.5, 3, 5])
+def test_power(power):
+    coefficients = taylor_coefficients(x**power, x, {x: 0.3}, 8)
+    expected = [
+        np.prod([power - i for i in range(k)]) / factorial(k) * 0.3 ** (power - k) for k in range(9)
+    ]
+    np.testing.assert_allclose(coefficients, expected)
+
+
+def test_whole_power_at_zero():
+    np.testing.assert_allclose(taylor_coefficients(x**3, x, {x: 0.0}, 5), [0, 0, 0, 1, 0, 0])
+
+
+def test_matches_nested_backward():
+    expression = multiply_all([exp(x * y), ln(x + 3), x**2.5, y]) / (x + y) + exponent(3.0, x)
+    values = {x: np.linspace(0.2, 1.5, 5), y: 0.7}
+    derivatives = taylor_derivatives(expression, x, values, 4)
+    assert derivatives.shape == (5, 5)
+
+    nested = expression
+    for derivative in derivatives:
+        np.testing.assert_allclose(derivative, nested.compute(values), rtol=1e-8)
+        nested = nested.backward(x)
+
+
+def test_independent_expression():
+    derivatives = taylor_derivatives(y * y, x, {x: 1.0, y: np.ones((2, 3))}, 3)
+    assert derivatives.shape == (4, 2, 3)
+    assert np.all(derivatives[1:] == 0)
+
+
+def test_scalar_variable_with_array_operand():
+    derivatives = taylor_derivatives(compile(x * y), x, {x: 2.0, y: np.arange(3.0)}, 2)
+    np.testing.assert_allclose(derivatives, [2 * np.arange(3.0), np.arange(3.0), np.zeros(3)])
+
+
+def test_order_zero_and_negative_orders():
+    np.testing.assert_allclose(taylor_derivatives(exp(x), x, {x: 0.3}, 0), [np.exp(0.3)])
+    with pytest.raises(ValueError):
+        taylor_derivatives(exp(x), x, {x: 0.3}, -1)
+
+
+@pytest.mark.parametrize("power", [np.array([2.5, 3.5]), np.array([2, 3])])
+def test_array_power(power):
+    derivatives = taylor_derivatives(x**power, x, {x: 1.5}, 2)
+    expected = [1.5**power, power * 1.5 ** (power - 1), power * (power - 1) * 1.5 ** (power - 2)]
+    np.testing.assert_allclose(derivatives, expected)
@@ -0,0 +1,27 @@
+import numpy as np
+
+from main import parallel
+from main.expression import Variable
+from main.parallel import threaded_compute
+from main.operations.addition import add_all
+from main.operations.exponent import exp
+from main.operations.logarithm import ln
+
+x = Variable("x")
+y = Variable("y")
+EXPRESSION = add_all([exp(x / 10) * y, ln(x + 1), x * x])
+VALUES = {x: np.linspace(0.0, 5.0, 1001), y: np.linspace(1.0, 2.0, 1001)}
+
+
+def test_threaded_compute_matches_compute():
+    result = threaded_compute(EXPRESSION, VALUES, workers=2, threshold=0)
+    np.testing.assert_allclose(result, EXPRESSION.compute(VALUES))
+
+
+def test_small_expressions_are_evaluated_serially(monkeypatch):
+    def unavailable(*args, **kwargs):
+        raise AssertionError("A thread pool was started")
+
+    monkeypatch.setattr(parallel, "ThreadPoolExecutor", unavailable)
+    result = threaded_compute(EXPRESSION, VALUES, workers=2, threshold=10**6)
+    np.testing.assert_allclose(result, EXPRESSION.compute(VALUES))
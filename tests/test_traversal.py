@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from main.expression import Variable, Constant
+from main.compiler import compile
+from main.operations.addition import Sum
+from main.operations.exponent import exp
+from main.operations.logarithm import ln
+from main.operations.multiplication import Product
+
+x = Variable("x")
+
+
+def _ambiguous_chain(depth, last=1.0):
+    # Both factors of every product are equal but distinct nodes, so they share a hash and
+    # cannot be paired up by it
+    node = x
+    for i in range(depth):
+        constant = Constant(last if i == depth - 1 else 1.0)
+        node = Product(Sum(node, Constant(1.0)), Sum(node, constant))
+    return node
+
+
+def test_deep_expression():
+    expression = x
+    for i in range(20000):
+        expression = expression * 1.0001 + 1e-6 if i % 2 else ln(exp(expression))
+    value = expression.compute({x: 0.5})
+    assert np.isfinite(value)
+    assert compile(expression).compute({x: 0.5}) == pytest.approx(value)
+    assert repr(expression).count("x") == 1
+
+
+def test_comparing_deep_ambiguous_graphs_does_not_recurse():
+    assert _ambiguous_chain(3000) == _ambiguous_chain(3000)
+    assert _ambiguous_chain(3000) != _ambiguous_chain(3000, last=2.0)